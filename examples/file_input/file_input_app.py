@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import time
-from io import StringIO
 from pathlib import Path
 
 import param
@@ -10,16 +9,18 @@ import pandas as pd
 import numpy as np
 import yaml
 
-from lumflux.control_panels import ControlPanel
+from lumflux.control_panels import CSVInputControl
 from lumflux.constructor import AppConstructor
 
 
-class FileInputControl(ControlPanel):
-    """Input .csv files"""
+class FileInputControl(CSVInputControl):
+    """Input .csv files
 
-    _type = 'file_input'
+    Files are parsed in the background by `CSVInputControl`
+
+    """
 
-    single_file = param.Parameter()
+    _type = 'file_input'
 
     test_button = param.Action(lambda self: self._action_button(), label="Reset")
 
@@ -35,44 +36,7 @@ class FileInputControl(ControlPanel):
     )
 
     def _action_button(self):
-        self.single_file = None
-
-    def generate_widgets(self, **kwargs) -> dict:
-        """Generates widgets
-
-        By default, widgets are generated from the object's parameters. Custom widgets can
-        be added
-
-        Args:
-            **kwargs: Kwargs to pass to pn.Param's `widgets` keyword argument. Use to
-            override default mappings.
-
-        Returns:
-            Dictionary of widgets.
-
-        """
-
-        file_input = pn.widgets.FileInput(accept='.csv', multiple=False)
-        widgets = super().generate_widgets(single_file=file_input)
-
-        return widgets
-
-    @param.depends('single_file', watch=True)
-    def _file_input_updated(self):
-        if self.single_file is None:
-            return
-
-        sio = StringIO(self.single_file.decode('UTF-8'))
-
-        df = pd.read_csv(sio, **self.kwargs)
-
-        self.sources['main'].set(df, 'main')
-
-    @property
-    def kwargs(self):
-        return {
-            "index_col": self.index_col
-        }
+        self.input_file = None
 
     @property
     def layout(self) -> list[tuple]:
@@ -41,15 +41,17 @@ class MWEControl(ControlPanel):
         num_tasks = np.random.randint(4, 12)
         pbar = self.widgets["pbar"]
         pbar.num_tasks = num_tasks
-        for i in range(num_tasks):
-            pbar.completed += 1
+        # Transforms and views are updated once, after the last item is set
+        with self.sources['main'].batch():
+            for i in range(num_tasks):
+                pbar.completed += 1
 
-            df = pd.DataFrame(
-                {'x': np.arange(10), 'y': np.random.rand(10)}
-            )
-            self.sources['main'].set(df, "test_data")
+                df = pd.DataFrame(
+                    {'x': np.arange(10), 'y': np.random.rand(10)}
+                )
+                self.sources['main'].set(df, "test_data")
 
-            time.sleep(0.25*np.random.rand())
+                time.sleep(0.25*np.random.rand())
 
         pbar.reset()
 
@@ -1,8 +1,57 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import numpy as np
 import param
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ModuleNotFoundError:
+    pa = None
+    pq = None
+
+
+def sizeof(value: Any) -> int:
+    """Estimate the memory footprint of a cached value in bytes.
+
+    Args:
+        value: Value to estimate the size of.
+
+    Returns:
+        Size of the value in bytes. Objects of unknown type count as zero bytes.
+
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    elif isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(index=True, deep=True))
+    elif isinstance(value, np.ndarray):
+        return value.nbytes
+    elif hasattr(value, "estimated_size"):  # polars DataFrame
+        return int(value.estimated_size())
+    else:
+        return int(getattr(value, "nbytes", 0))
+
 
 class Cache(param.Parameterized):
+    # Guards cache access by transforms evaluated on multiple threads. Shared by all
+    # caches, as instances are deep-copied when used as parameter defaults
+    lock = threading.RLock()
+
     def __getitem__(self, item):
         return None
 
@@ -12,32 +61,145 @@ class Cache(param.Parameterized):
     def __contains__(self, item):
         return False
 
+    def set(self, key, value, cost: Optional[float] = None):
+        """Add an item to the cache.
+
+        Args:
+            key: Key to store the item under.
+            value: Item to store.
+            cost: Optional cost (typically compute time in seconds) of producing the item.
+
+        """
+        self[key] = value
+
 
 class MemoryCache(Cache):
+    """
 
-    _cache = param.Dict(default={})
+    In-memory cache
+
+    Items are evicted when either `max_items` or `max_bytes` is exceeded. With the 'lru'
+    policy the least recently used item is evicted first. The 'gds' (GreedyDual-Size)
+    policy evicts items with the lowest cost per byte first, where cost is the time it
+    took to produce the item, and ages items which are not used.
+
+    """
+
+    _cache = param.Dict(default=OrderedDict())
+
+    _sizes = param.Dict(default={}, doc="Sizes in bytes of cached items")
+
+    _costs = param.Dict(default={}, doc="Costs (compute time) of cached items")
+
+    _priorities = param.Dict(
+        default={}, doc="GreedyDual-Size priorities and sequence numbers of cached items"
+    )
+
+    _heap = param.List(default=[], doc="Heap of (priority, sequence, key) tuples")
+
+    _inflation = param.Number(0.0, doc="GreedyDual-Size inflation value")
+
+    _nbytes = param.Integer(0, doc="Total size in bytes of cached items")
 
     max_items = param.Integer(None, doc="Maximum number of items allowed in the cache")
 
+    max_bytes = param.Integer(
+        None, doc="Maximum total size in bytes of the items in the cache"
+    )
+
+    policy = param.Selector(
+        default="lru",
+        objects=["lru", "gds"],
+        doc="Eviction policy, least recently used or cost-aware GreedyDual-Size",
+    )
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self._counter = itertools.count()
+
     def __getitem__(self, item):
-        return self._cache.__getitem__(item)
+        value = self._cache.__getitem__(item)
+        if self.policy == "lru":
+            self._cache.move_to_end(item)
+        else:
+            self._push(item)
+
+        return value
 
     def __setitem__(self, key, value):
-        if self.max_items is not None and len(self._cache) >= self.max_items:
-            self._cache.popitem()
+        self.set(key, value)
+
+    def set(self, key, value, cost: Optional[float] = None):
+        if key in self._cache:
+            self._remove(key)
+
+        size = sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # item would evict all other items and still not fit
+            return
 
         self._cache[key] = value
+        self._sizes[key] = size
+        self._costs[key] = cost or 0.0
+        self._nbytes += size
+        if self.policy == "gds":
+            self._push(key)
+
+        self._evict()
 
     def __contains__(self, item):
         return item in self._cache
 
+    @property
+    def full(self) -> bool:
+        if self.max_items is not None and len(self._cache) > self.max_items:
+            return True
+        elif self.max_bytes is not None and self._nbytes > self.max_bytes:
+            return True
+        else:
+            return False
+
+    def _remove(self, key):
+        del self._cache[key]
+        del self._costs[key]
+        self._priorities.pop(key, None)
+        self._nbytes -= self._sizes.pop(key)
+
+    def _push(self, key):
+        """(Re)sets the GreedyDual-Size priority of `key` to inflation + cost / size"""
+        priority = self._inflation + self._costs[key] / max(self._sizes[key], 1)
+        seq = next(self._counter)
+        self._priorities[key] = (priority, seq)
+        heapq.heappush(self._heap, (priority, seq, key))
+
+        # Outdated heap entries are skipped on eviction; rebuild when they pile up
+        if len(self._heap) > 2 * len(self._cache) + 16:
+            self._heap = [(p, s, k) for k, (p, s) in self._priorities.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_lowest(self):
+        while self._heap:
+            priority, seq, key = heapq.heappop(self._heap)
+            if self._priorities.get(key) == (priority, seq):
+                self._inflation = priority
+                return key
+
+        # no valid heap entries (policy was changed), fall back to insertion order
+        return next(iter(self._cache))
+
+    def _evict(self):
+        while self.full:
+            key = next(iter(self._cache)) if self.policy == "lru" else self._pop_lowest()
+            self._remove(key)
+
 
 class HybridHDFCache(Cache):
     """
 
     Hybrid HDFStore / Memory cache
 
-    Sometimes there are errors depending on the dtypes of dataframes stored
+    Sometimes there are errors depending on the dtypes of dataframes stored. See
+    `HybridArrowCache` for a cache which spills to Arrow-based files instead.
 
     """
 
@@ -98,3 +260,190 @@ class HybridHDFCache(Cache):
     # todo with statement for creating caches?
     # def __exit__(self):
     #     pass
+
+
+class HybridArrowCache(Cache):
+    """
+
+    Hybrid Parquet or Feather / Memory cache
+
+    DataFrames and Series larger than `bytes_threshold` are spilled to files in
+    `cache_dir`. Arrow stores pandas dtypes (including categoricals) faithfully, so spilled
+    items are not read back to verify them. Items which cannot be converted to Arrow
+    tables (for example object columns with mixed types) are kept in memory.
+
+    The 'parquet' format writes compressed files and deserializes them on every hit. The
+    'feather' format writes uncompressed Arrow IPC files which are memory mapped when read,
+    such that hits are (mostly) zero-copy views on the OS page cache, shared between
+    sessions and processes. Arrays returned from memory mapped files are read-only.
+
+    With `persistent` enabled, all DataFrames and Series are written to `cache_dir` and
+    files written in earlier sessions are reused. This requires keys which are stable
+    between sessions (see `AppConstructor.hash_method`).
+
+    Requires `pyarrow`.
+
+    """
+
+    cache_dir = param.String(
+        default=None,
+        doc="Directory to store spilled items in. A temporary directory is used if not given",
+    )
+
+    format = param.Selector(
+        default="parquet",
+        objects=["parquet", "feather"],
+        doc="File format for spilled items",
+    )
+
+    compression = param.Selector(
+        default="zstd",
+        objects=["zstd", "lz4", "snappy", None],
+        doc="Compression codec for spilled items. Not used for the 'feather' format",
+    )
+
+    bytes_threshold = param.Integer(default=int(1e8))
+
+    persistent = param.Boolean(
+        default=False,
+        doc="Write all items to disk and reuse items written in earlier sessions",
+    )
+
+    _cache = param.Dict(default={})
+
+    _files = param.Dict(default={}, doc="Paths of spilled items")
+
+    def __init__(self, **params):
+        if pa is None:
+            raise ModuleNotFoundError(
+                f"{self.__class__.__name__} requires 'pyarrow' to be installed"
+            )
+        super().__init__(**params)
+        if self.cache_dir is None:
+            if self.persistent:
+                raise ValueError("A 'cache_dir' must be given for persistent caches")
+            self.cache_dir = tempfile.mkdtemp(prefix="lumflux_")
+            # Spilled items of non-persistent caches are removed with the cache
+            weakref.finalize(self, shutil.rmtree, self.cache_dir, ignore_errors=True)
+        Path(self.cache_dir).mkdir(parents=True, exist_ok=True)
+
+    def __getitem__(self, item):
+        return self.get(item)
+
+    def get(self, item, columns: Optional[list[str]] = None):
+        """Get an item from the cache.
+
+        Args:
+            item: Key of the item.
+            columns: Optional list of columns to read. Only applies to spilled items.
+
+        Returns:
+            The cached item.
+
+        """
+        key = str(item)
+        try:
+            return self._cache.__getitem__(key)
+        except KeyError:
+            path = self._lookup(key)
+            if path is None:
+                raise
+
+        return self._read(path, columns)
+
+    def __setitem__(self, key, value):
+        key = str(key)
+        if not isinstance(value, (pd.DataFrame, pd.Series)):
+            self._cache[key] = value
+        elif sizeof(value) > self.bytes_threshold:
+            self._store_put(key, value)
+        elif self.persistent:
+            # Small items are written for later sessions but served from memory
+            self._store_put(key, value)
+            self._cache[key] = value
+        else:
+            self._cache[key] = value
+
+    def __contains__(self, item):
+        key = str(item)
+        return key in self._cache or self._lookup(key) is not None
+
+    def _lookup(self, key: str) -> Optional[Path]:
+        """Returns the path of the spilled item `key`, or `None` if it is not on disk"""
+        try:
+            return self._files[key]
+        except KeyError:
+            pass
+
+        path = self.path(key)
+        if self.persistent and path.exists():
+            # written in an earlier session
+            self._files[key] = path
+            return path
+
+    @property
+    def suffix(self) -> str:
+        return f".{self.format}"
+
+    def path(self, key: str) -> Path:
+        """Path of the file where the item with key `key` is spilled to"""
+        name = hashlib.md5(key.encode("UTF-8")).hexdigest()
+        return Path(self.cache_dir) / f"{name}{self.suffix}"
+
+    def _store_put(self, key, value):
+        is_series = isinstance(value, pd.Series)
+        df = value.to_frame() if is_series else value
+        try:
+            table = pa.Table.from_pandas(df)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            self._cache[key] = value
+            return
+
+        # Store Series info in the file such that items can be restored in later sessions
+        info = {"series": is_series, "name": getattr(value, "name", None)}
+        metadata = {**table.schema.metadata, b"lumflux": json.dumps(info, default=str)}
+        table = table.replace_schema_metadata(metadata)
+
+        # Write to a temporary file first so readers never see partially written files.
+        # Temporary files are unique, as the cache directory may be shared by processes
+        path = self.path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            self._write(table, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        self._files[key] = path
+
+    def _write(self, table, path):
+        if self.format == "parquet":
+            pq.write_table(table, path, compression=self.compression)
+        elif self.format == "feather":
+            with pa.OSFile(str(path), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+    def _read(self, path, columns=None) -> Union[pd.DataFrame, pd.Series]:
+        if path.suffix == ".parquet":
+            table = pq.read_table(path, columns=columns, use_pandas_metadata=True)
+            df = table.to_pandas()
+        else:
+            # Arrow buffers point into the memory map; `split_blocks` prevents pandas from
+            # consolidating (copying) columns into 2D blocks
+            table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+            if columns is not None:
+                metadata = table.schema.pandas_metadata or {}
+                index_columns = [
+                    c for c in metadata.get("index_columns", []) if isinstance(c, str)
+                ]
+                table = table.select(list(columns) + index_columns)
+            df = table.to_pandas(split_blocks=True)
+
+        info = json.loads((table.schema.metadata or {}).get(b"lumflux", b"{}"))
+        if info.get("series", False):
+            return df.iloc[:, 0].rename(info["name"])
+        else:
+            return df
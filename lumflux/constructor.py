@@ -7,7 +7,7 @@ from typing import Any, Optional, Type, Union
 import yaml
 
 from lumflux.control_panels import ControlPanel
-from lumflux.support import gen_subclasses
+from lumflux.support import gen_subclasses, HASH_METHODS
 from lumflux.main_controllers import MainController
 from lumflux.opts import OptsBase
 from lumflux.sources import *
@@ -15,6 +15,7 @@ from lumflux.tools import supported_tools
 from lumflux.transforms import *
 from lumflux.views import View
 from lumflux.cache import Cache
+from lumflux.scheduler import Scheduler
 
 element_count = 0
 
@@ -69,9 +70,41 @@ class AppConstructor(param.Parameterized):
         doc="Type of Cache object to use for the application"
     )
 
+    hash_method = param.Selector(
+        default="builtin",
+        objects=HASH_METHODS,
+        doc="Hashing method for sources and transforms. Use 'md5' or 'blake2' for hashes "
+            "which are stable between sessions, as required by persistent caches"
+    )
+
+    scheduled = param.Boolean(
+        default=True,
+        doc="Propagate updates through transforms and views with a Scheduler, such that "
+            "each element is updated once per change in topological order"
+    )
+
+    fuse_transforms = param.Boolean(
+        default=False,
+        doc="Make transforms lazy whose results are only read by a single downstream "
+            "transform, such that chains of transforms are applied fused without caching "
+            "intermediate results"
+    )
+
+    project_columns = param.Boolean(
+        default=True,
+        doc="Only read the columns of file-backed sources which are used by downstream "
+            "transforms and views",
+    )
+
     def __init__(self, **params):
         super().__init__(**params)
+        self.scheduler = None
         self.classes = self.find_classes(duplicates=self.errors)
+        if getattr(self.cache, "persistent", False) and self.hash_method == "builtin":
+            warnings.warn(
+                "Persistent caches require a stable 'hash_method' ('md5' or 'blake2'), "
+                "builtin hashes change between sessions"
+            )
 
     def get_loader(self) -> Type[yaml.SafeLoader]:
         """
@@ -132,6 +165,14 @@ class AppConstructor(param.Parameterized):
             klass = self._resolve_class(spec.pop("type"), "control_panels")
             control_panels.append((klass, spec))
 
+        if self.fuse_transforms:
+            self._fuse_transforms()
+
+        if self.project_columns:
+            self._project_columns()
+
+        if self.scheduled:
+            self.scheduler = Scheduler(transforms=self.transforms, views=self.views)
 
         main_ctrl_spec = app_spec["main_controller"]
         main_ctrl_class = self._resolve_class(main_ctrl_spec.pop("type"), "main")
@@ -145,9 +186,64 @@ class AppConstructor(param.Parameterized):
             **kwargs,
             **main_ctrl_spec,
         )
+        if self.scheduler is not None:
+            self.scheduler.executor = ctrl.executor
 
         return ctrl
 
+    def _fuse_transforms(self):
+        """Marks transforms as lazy when their only reader is another AppTransform.
+
+        Only transforms which are fusable (see `AppTransform.fusable`) and are read by a
+        fusable transform are made lazy.
+
+        """
+        readers = {transform: [] for transform in self.transforms.values()}
+        for obj in list(self.transforms.values()) + list(self.views.values()):
+            for upstream in obj.upstream:
+                if upstream in readers:
+                    readers[upstream].append(obj)
+
+        for transform, objs in readers.items():
+            if (
+                isinstance(transform, AppTransform)
+                and transform.fusable
+                and len(objs) == 1
+                and isinstance(objs[0], AppTransform)
+                and objs[0].fusable
+            ):
+                transform.lazy = True
+
+    def _project_columns(self):
+        """Sets the columns read from file-backed sources to the columns used downstream"""
+        readers = {transform: [] for transform in self.transforms.values()}
+        for obj in list(self.transforms.values()) + list(self.views.values()):
+            # Additional view dependencies only trigger updates, their data is not read
+            upstream = [obj.source] if isinstance(obj, View) else obj.upstream
+            for transform in upstream:
+                if transform in readers:
+                    readers[transform].append(obj)
+
+        upstream = {transform: transform.upstream for transform in self.transforms.values()}
+        needed = {}
+        for transform in reversed(Scheduler.topological_sort(upstream)):
+            columns = [] if readers[transform] else None
+            for obj in readers[transform]:
+                if isinstance(obj, View):
+                    required = obj.required_columns
+                else:
+                    required = obj.input_columns(needed[obj])
+                if required is None:
+                    columns = None
+                    break
+                columns += [column for column in required if column not in columns]
+            needed[transform] = columns
+
+            if isinstance(transform, GetItemTransform) and isinstance(
+                transform.source, FileTableSource
+            ):
+                transform.columns = columns
+
     @staticmethod
     def find_classes(duplicates: Optional[str] = 'raise') -> dict[str, dict[str: Any]]:  # Todo base class for everything
         """Returns a nested dict with implementations of all lumflux element types
@@ -235,6 +331,8 @@ class AppConstructor(param.Parameterized):
         class_ = self._resolve_class(_type, element)
         if element == "transform":
             kwargs["_cache"] = self.cache
+        if element in ["transform", "source"]:
+            kwargs["_hash_method"] = self.hash_method
         obj = class_(name=name, **kwargs)
         element_count += 1
 
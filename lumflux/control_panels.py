@@ -1,6 +1,13 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+
 import param
+import pandas as pd
 from lumflux.main_controllers import MainController
 from lumflux.base import HasWidgets
+from lumflux.support import read_csv_bytes, downcast_dtypes
+from lumflux.widgets import ASyncProgressBar
 
 import panel as pn
 
@@ -80,3 +87,121 @@ class ControlPanel(HasWidgets):
     @property
     def panel(self):
         return self._box
+
+
+class CSVInputControl(ControlPanel):
+    """Control panel which loads uploaded .csv files into a table source.
+
+    Files are parsed on a worker thread (see `read_csv_bytes`), such that the app remains
+    responsive while large files are parsed. Progress is shown in a progress bar and the
+    parsed table is set on the source in a single update.
+
+    """
+
+    _type = "csv_input"
+
+    header = param.String("CSV input")
+
+    input_file = param.Parameter(doc="Contents of the uploaded file", label="CSV file")
+
+    index_col = param.Integer(
+        None, bounds=(0, None), doc="Position of the column to use as index", label="Index column"
+    )
+
+    sep = param.String(",", doc="Field delimiter", label="Delimiter")
+
+    downcast = param.Boolean(
+        False,
+        doc="Downcast numeric columns and convert string columns with few unique values to "
+            "categoricals",
+    )
+
+    categorical_threshold = param.Number(
+        0.5,
+        bounds=(0, 1),
+        precedence=-1,
+        doc="Maximum ratio of unique values to rows of string columns converted to categoricals",
+    )
+
+    source = param.String("main", precedence=-1, doc="Name of the source to set tables on")
+
+    item = param.String("main", precedence=-1, doc="Name of the table to set on the source")
+
+    block_size = param.Integer(1 << 24, bounds=(1, None), precedence=-1, doc="Bytes per block")
+
+    def __init__(self, parent, **params):
+        self._executor = None
+        self._ingest_count = 0
+        super().__init__(parent, **params)
+
+    def generate_widgets(self, **kwargs) -> dict:
+        file_input = pn.widgets.FileInput(accept=".csv", multiple=False)
+        widgets = super().generate_widgets(input_file=file_input, **kwargs)
+        widgets["pbar"] = ASyncProgressBar()
+
+        return widgets
+
+    @property
+    def executor(self) -> Executor:
+        """The main controller's executor, or a single worker thread if it has none"""
+        executor = getattr(self.parent, "executor", None)
+        if executor is not None:
+            return executor
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lumflux")
+        return self._executor
+
+    @param.depends("input_file", watch=True)
+    def _input_file_updated(self):
+        if self.input_file is None:
+            return
+
+        self._ingest_count += 1
+        pn.state.execute(partial(self._ingest, self.input_file, self._ingest_count))
+
+    async def _ingest(self, data: bytes, count: int) -> None:
+        df = await self.ingest(data)
+        # Tables of files uploaded later supersede this one
+        if count == self._ingest_count:
+            self.sources[self.source].set(df, self.item)
+
+    async def ingest(self, data: bytes) -> pd.DataFrame:
+        """Parse CSV data on the executor while updating the progress bar.
+
+        Args:
+            data: Contents of a .csv file.
+
+        Returns:
+            The parsed (and optionally downcast) table.
+
+        """
+        pbar = self.widgets["pbar"]
+        pbar.num_tasks = 100
+        pbar.active = True
+        fraction = [0.0]  # Written by the worker thread, read here
+
+        func = partial(
+            read_csv_bytes,
+            data,
+            progress=partial(fraction.__setitem__, 0),
+            index_col=self.index_col,
+            sep=self.sep,
+            block_size=self.block_size,
+        )
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self.executor, func)
+            while not future.done():
+                await asyncio.wait([future], timeout=0.1)
+                pbar.completed = int(99 * fraction[0])
+            df = future.result()
+
+            if self.downcast:
+                df = await loop.run_in_executor(
+                    self.executor, downcast_dtypes, df, self.categorical_threshold
+                )
+        finally:
+            pbar.active = False
+            pbar.reset()
+
+        return df
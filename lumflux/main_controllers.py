@@ -1,9 +1,12 @@
 import logging
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
 
 import panel as pn
 import param
 
+from lumflux.scheduler import Scheduler
 
 
 class MainController(param.Parameterized):
@@ -44,8 +47,23 @@ class MainController(param.Parameterized):
 
     loggers = param.Dict({}, doc="Dictionary of loggers")
 
+    max_workers = param.Integer(
+        None,
+        bounds=(1, None),
+        doc="Number of threads used to evaluate independent transforms concurrently. The "
+            "executor is used by the app's Scheduler. Results are passed to the views through "
+            "the transforms' cache, such that with the default no-op Cache() no transforms "
+            "are evaluated. If None, transforms are evaluated serially by the views",
+    )
+
     def __init__(self, control_panels, **params):
         super(MainController, self).__init__(**params)
+        if self.max_workers is None:
+            self.executor = None
+        else:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="lumflux"
+            )
         # self.client = client if client else Client()
         # check for client adress in config
 
@@ -57,7 +75,32 @@ class MainController(param.Parameterized):
 
         # self.update()  # todo check to see if this is really needed
 
+    @contextmanager
+    def batch(self):
+        """Context manager which batches updates of all sources.
+
+        Each source which is updated within the context fires a single `updated` event on
+        exit. See `Source.batch`.
+
+        """
+        with ExitStack() as stack:
+            for source in self.sources.values():
+                stack.enter_context(source.batch())
+            yield self
+
     def update(self):
+        if self.executor is not None:
+            self.evaluate_transforms()
+        # Views are updated on the calling (document) thread
         for view in self.views.values():
             view.update()
 
+    def evaluate_transforms(self):
+        """Evaluates all transforms on the executor, see `Scheduler.evaluate`.
+
+        Results are stored in the transforms' cache, such that subsequent calls to `get`
+        from the views are cache hits.
+
+        """
+        Scheduler.evaluate(list(self.transforms.values()), self.executor)
+
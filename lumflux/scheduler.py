@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor
+from typing import Any
+
+import param
+
+from lumflux.transforms import Transform
+
+
+class Scheduler(param.Parameterized):
+    """Propagates updates through the dependency graph of transforms and views.
+
+    Without a scheduler, each transform and view updates itself when the `updated` event
+    of one of its upstream objects fires. In graphs where a node is reachable via multiple
+    paths, the node is then updated multiple times per change.
+
+    The scheduler builds the graph of transforms and views from their `upstream` objects and
+    takes over their updates. When an upstream object fires `updated`, all nodes downstream
+    are updated once in topological order. Views are updated once per change, after all
+    transforms they depend on.
+
+    With an `executor`, the updated transforms are evaluated on the executor before the
+    views are updated, such that independent branches of the graph are computed
+    concurrently. Views are updated on the calling (document) thread from cached results.
+
+    """
+
+    transforms = param.Dict(default={}, doc="Dictionary of transforms to schedule")
+
+    views = param.Dict(default={}, doc="Dictionary of views to schedule")
+
+    executor = param.ClassSelector(
+        default=None,
+        class_=Executor,
+        doc="Executor to evaluate updated transforms on. If None, transforms are evaluated "
+            "serially by the views",
+    )
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        nodes = list(self.transforms.values()) + list(self.views.values())
+        self._upstream = {node: list(node.upstream) for node in nodes}
+        self._order = self.topological_sort(self._upstream)
+        self._index = {node: i for i, node in enumerate(self._order)}
+        self._views = set(self.views.values())
+
+        self._running = False
+        self._current = -1
+        self._dirty = set()
+        self._pending = []
+
+        roots = {
+            obj
+            for upstream in self._upstream.values()
+            for obj in upstream
+            if obj not in self._index
+        }
+        for obj in list(roots) + list(self.transforms.values()):
+            obj.param.watch(self._updated, ["updated"])
+
+        for node in nodes:
+            node._scheduler = self
+
+    @staticmethod
+    def topological_sort(upstream: dict[Any, list]) -> list:
+        """Sorts nodes such that every node comes after all of its upstream nodes.
+
+        Args:
+            upstream: Dict of node: list of upstream objects. Upstream objects which are
+                not nodes themselves are ignored.
+
+        Returns:
+            List of nodes in topological order.
+
+        """
+        n_upstream = {
+            node: len([obj for obj in objs if obj in upstream])
+            for node, objs in upstream.items()
+        }
+        downstream = {node: [] for node in upstream}
+        for node, objs in upstream.items():
+            for obj in objs:
+                if obj in downstream:
+                    downstream[obj].append(node)
+
+        order = [node for node, n in n_upstream.items() if n == 0]
+        for node in order:
+            for child in downstream[node]:
+                n_upstream[child] -= 1
+                if n_upstream[child] == 0:
+                    order.append(child)
+
+        if len(order) != len(upstream):
+            cycle = [node.name for node, n in n_upstream.items() if n > 0]
+            raise ValueError(f"Dependency graph contains a cycle between {cycle}")
+
+        return order
+
+    @classmethod
+    def evaluate(cls, transforms: list, executor: Executor) -> None:
+        """Evaluates transforms on an executor, such that their results are cached.
+
+        Transforms are evaluated in levels, where each level only depends on transforms in
+        previous levels. Transforms within a level are evaluated concurrently. Transforms
+        whose results are not cached (see `Transform.cached`) are skipped, as evaluating
+        these ahead of time saves no work. Levels are determined from the whole graph of
+        upstream transforms, including those which are skipped, such that a transform is
+        never evaluated concurrently with one of its (indirect) upstream transforms.
+
+        Args:
+            transforms: Transforms to evaluate.
+            executor: Executor to evaluate the transforms on.
+
+        """
+        upstream = {}
+        stack = list(transforms)
+        while stack:
+            transform = stack.pop()
+            if transform in upstream:
+                continue
+            # Sources are not evaluated
+            upstream[transform] = [
+                obj for obj in transform.upstream if isinstance(obj, Transform)
+            ]
+            stack.extend(upstream[transform])
+
+        selected = set(transforms)
+        depth = {}
+        for transform in cls.topological_sort(upstream):
+            depth[transform] = 1 + max(
+                (depth[obj] for obj in upstream[transform]), default=-1
+            )
+            # Hashes are computed here rather than concurrently by the workers
+            transform.hash
+
+        levels = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for transform, d in depth.items():
+            if transform in selected and transform.cached:
+                levels[d].append(transform)
+
+        for level in levels:
+            futures = [executor.submit(transform.get) for transform in level]
+            for future in futures:
+                future.result()
+
+    def _updated(self, *events):
+        for event in events:
+            index = self._index.get(event.obj)
+            if self._running and index is not None and index >= self._current:
+                # Downstream nodes are still to be visited in the current pass
+                self._dirty.add(event.obj)
+            else:
+                self._pending.append(event.obj)
+
+        self.run()
+
+    def run(self, *objects):
+        """Updates all nodes downstream of `objects` and of pending updated objects.
+
+        Each node is updated at most once per pass. Objects which fire `updated` after
+        their downstream nodes were visited are handled in a next pass. Views are updated
+        at the end of each pass, after the updated transforms are evaluated on `executor`.
+
+        Args:
+            objects: Objects which are updated.
+
+        """
+        self._pending.extend(objects)
+        if self._running:
+            return
+
+        self._running = True
+        try:
+            while self._pending:
+                self._dirty = set(self._pending)
+                self._pending = []
+                transforms, views = [], []
+                for i, node in enumerate(self._order):
+                    self._current = i
+                    if not any(obj in self._dirty for obj in self._upstream[node]):
+                        continue
+                    # Views have no downstream nodes and are updated last
+                    if node in self._views:
+                        views.append(node)
+                    else:
+                        node.update()
+                        transforms.append(node)
+
+                if self.executor is not None:
+                    self.evaluate(transforms, self.executor)
+                for view in views:
+                    view.update()
+        finally:
+            self._running = False
+            self._current = -1
+            self._dirty = set()
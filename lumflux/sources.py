@@ -1,13 +1,49 @@
 from __future__ import annotations
 
+import asyncio
+import fnmatch
+import os
+import queue
+import sqlite3
+import threading
+import time
 import uuid
-from collections.abc import KeysView, ItemsView, ValuesView
-from typing import Optional, Any
+from collections import OrderedDict
+from contextlib import contextmanager
+from collections.abc import KeysView, ItemsView, ValuesView, Mapping
+from pathlib import Path
+from typing import Optional, Any, Union, Hashable, Iterator
 
 import pandas as pd
+import panel as pn
 import param
 
-from lumflux.support import hash_dataframe
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ModuleNotFoundError:
+    pa = None
+    pq = None
+
+try:
+    import duckdb
+except ModuleNotFoundError:
+    duckdb = None
+
+try:
+    from watchdog.observers import Observer
+except ModuleNotFoundError:
+    Observer = None
+
+from lumflux.cache import sizeof, MemoryCache
+from lumflux.support import (
+    hash_dataframe,
+    hash_dataframe_columns,
+    hash_dataframe_sampled,
+    hash_object,
+    HASH_METHODS,
+    RingBuffer,
+)
 
 
 class Source(param.Parameterized):
@@ -17,9 +53,48 @@ class Source(param.Parameterized):
 
     updated = param.Event()
 
+    _hash_method = param.Selector(
+        default="builtin",
+        objects=HASH_METHODS,
+        doc="Method used to hash items. 'md5' and 'blake2' are stable between sessions",
+    )
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self._batch_depth = 0
+        self._batch_items = set()  # Names of items updated in the current batch
+        self._batch_updated = False
+
     # def get(self) -> None:
     #     raise NotImplementedError()
 
+    @contextmanager
+    def batch(self) -> Iterator[Source]:
+        """Context manager which combines updates into a single `updated` event.
+
+        Within the context, items are hashed and stored as usual, but `updated` fires only
+        once on exit, if any item was updated. Batches can be nested.
+
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._batch_items = set()
+                if self._batch_updated:
+                    self._batch_updated = False
+                    self.updated = True
+
+    def _signal_updated(self, name: Optional[Hashable] = None) -> None:
+        """Fire `updated`, or defer it to the end of the current batch"""
+        if self._batch_depth:
+            self._batch_items.add(name)
+            self._batch_updated = True
+        else:
+            self.updated = True
+
 
 class GenericSource(Source):
 
@@ -27,6 +102,17 @@ class GenericSource(Source):
 
     hashes = param.Dict(default={})
 
+    column_hashes = param.Dict(
+        default={},
+        doc="Per-column hashes of items, or None for items whose columns are not hashed",
+    )
+
+    deltas = param.Dict(
+        default={},
+        doc="Items which were last updated by appending rows, as (previous hash, start, stop) "
+            "where rows [start, stop) are appended to the item with the previous hash",
+    )
+
     @property
     def singular(self) -> bool:
         return len(self.contents) == 1
@@ -35,7 +121,35 @@ class GenericSource(Source):
     def empty(self) -> bool:
         return len(self.contents) == 0
 
-    def set(self, item, name=None):
+    def set(self, item, name=None, version: Optional[Hashable] = None):
+        """Set an item on the source.
+
+        Args:
+            item: Item to set.
+            name: Name of the item. Can be omitted for sources with a single item.
+            version: Optional version token supplied by the caller, included in the item's
+                hash.
+
+        """
+        name = self._item_name(name)
+        self._store(item, name, version)
+        self.deltas.pop(name, None)
+        self._signal_updated(name)
+
+    def set_many(self, items: dict, version: Optional[Hashable] = None):
+        """Set multiple items, firing a single `updated` event.
+
+        Args:
+            items: Dict of name: item.
+            version: Optional version token, included in the hashes of all items.
+
+        """
+        with self.batch():
+            for name, item in items.items():
+                self.set(item, name=name, version=version)
+
+    def _item_name(self, name: Optional[Hashable]) -> Hashable:
+        """Name of the item to set, generated or inferred if `name` is omitted"""
         if self.empty and name is None:
             name = uuid.uuid4()
         # Overwriting the current item
@@ -44,9 +158,27 @@ class GenericSource(Source):
         elif name is None:
             raise ValueError("No name given for new source item.")
 
-        self.hashes[name] = self.hash_item(item)
+        return name
+
+    def _record_delta(self, name: Hashable, previous_hash, start: int, stop: int) -> None:
+        """Record rows [start, stop) appended to an item with the previous hash.
+
+        Consecutive appends to an item within a batch are recorded as a single delta.
+
+        """
+        delta = self.deltas.get(name)
+        if delta is not None and name in self._batch_items:
+            previous_hash, start = delta[:2]
+        self.deltas[name] = (previous_hash, start, stop)
+
+    def _store(self, item, name: Hashable, version: Optional[Hashable] = None) -> None:
+        """Hash and store an item, without signalling the update"""
+        column_hashes = self.hash_columns(item)
+        self.hashes[name] = self.hash_item(
+            item, version=version, column_hashes=column_hashes
+        )
+        self.column_hashes[name] = column_hashes
         self.contents[name] = item
-        self.updated = True
 
     def get(self, name: Optional[str] = None) -> Any:
         if self.empty:
@@ -56,8 +188,20 @@ class GenericSource(Source):
 
         return self.contents.get(name)
 
-    def hash_item(self, item) -> int:
-        return hash(item)
+    def hash_item(
+        self,
+        item,
+        version: Optional[Hashable] = None,
+        column_hashes: Optional[dict] = None,
+    ) -> Union[int, str]:
+        if version is None:
+            return hash_object(item, method=self._hash_method)
+        else:
+            return hash_object((item, version), method=self._hash_method)
+
+    def hash_columns(self, item) -> Optional[dict]:
+        """Hash the individual columns of an item, `None` if not supported for the item"""
+        return None
 
     def keys(self) -> KeysView:
         return self.contents.keys()
@@ -71,13 +215,889 @@ class GenericSource(Source):
 
 
 class TableSource(GenericSource):
+    """Source for pandas DataFrames
+
+    By default, items are hashed by all their values ('full' hash strategy). For large
+    tables, the 'sampled' strategy only hashes shape, dtypes and a subset of rows, and the
+    'version' strategy skips hashing altogether and instead assigns each `set` a new
+    version number.
 
+    With the 'full' strategy, each column is also hashed separately (`column_hashes`), such
+    that transforms which only read some columns are not invalidated by changes to others.
+
+    """
 
     _type = "table"
 
-    def hash_item(self, item) -> str:
-        return hash_dataframe(item)
+    hash_strategy = param.Selector(
+        default="full",
+        objects=["full", "sampled", "version"],
+        doc="How to hash tables: all rows, a sample of rows or by version counter",
+    )
+
+    n_samples = param.Integer(
+        1000,
+        bounds=(0, None),
+        doc="Number of equidistant rows hashed by the 'sampled' hash strategy",
+    )
+
+    block_size = param.Integer(
+        100,
+        bounds=(0, None),
+        doc="Number of head and tail rows hashed by the 'sampled' hash strategy",
+    )
+
+    _version = param.Integer(0, doc="Version counter for the 'version' hash strategy")
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        # Unique per instance such that version hashes are never reused between sessions
+        self._token = uuid.uuid4().hex
+
+    def hash_item(
+        self,
+        item,
+        version: Optional[Hashable] = None,
+        column_hashes: Optional[dict] = None,
+    ) -> str:
+        if self.hash_strategy == "version":
+            self._version += 1
+            tup = (self._token, self._version, version)
+            return str(hash_object(tup, method=self._hash_method))
+        elif self.hash_strategy == "sampled":
+            h = hash_dataframe_sampled(
+                item,
+                method=self._hash_method,
+                n_samples=self.n_samples,
+                block_size=self.block_size,
+            )
+        elif column_hashes:
+            # Every column hash includes the index hash
+            tup = (item.shape, tuple(column_hashes.items()))
+            h = str(hash_object(tup, method=self._hash_method))
+        else:
+            h = hash_dataframe(item, method=self._hash_method)
+
+        if version is None:
+            return h
+        else:
+            return str(hash_object((h, version), method=self._hash_method))
+
+    def append(self, rows: pd.DataFrame, name=None, version: Optional[Hashable] = None):
+        """Append rows to a table.
+
+        The appended row range is recorded in `deltas`, such that incremental transforms
+        only process the new rows.
+
+        Args:
+            rows: Rows to append, with the same columns as the table.
+            name: Name of the table. Can be omitted for sources with a single table.
+            version: Optional version token supplied by the caller, included in the table's
+                hash.
+
+        """
+        name = self._item_name(name)
+        previous = self.contents.get(name)
+        if previous is None:
+            self.set(rows, name=name, version=version)
+            return
+
+        previous_hash = self.hashes[name]
+        item = pd.concat([previous, rows])
+        self._store(item, name, version)
+        self._record_delta(name, previous_hash, len(previous), len(item))
+        self._signal_updated(name)
+
+    def hash_columns(self, item) -> Optional[dict]:
+        # Only the 'full' strategy hashes all values
+        if self.hash_strategy != "full":
+            return None
+        return hash_dataframe_columns(item, method=self._hash_method)
+
+
+class StreamingTableSource(GenericSource):
+    """Source for live tables with a fixed capacity, such as streamed instrument data.
+
+    Tables are stored in ring buffers (see `RingBuffer`) which keep the last `capacity`
+    rows. Appending rows does not rehash the table, instead each update assigns a new
+    version number. Rows are indexed by their number in the stream of appended rows.
+
+    """
+
+    _type = "streaming_table"
+
+    capacity = param.Integer(
+        10000, bounds=(1, None), doc="Maximum number of rows kept per table"
+    )
+
+    _version = param.Integer(0, doc="Version counter used as hash")
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self._token = uuid.uuid4().hex
+        self._frames = {}
+
+    def set(self, item, name=None, version: Optional[Hashable] = None):
+        """Replace a table by the last `capacity` rows of `item`"""
+        buffer = RingBuffer(self.capacity)
+        buffer.append(item)
+        super().set(buffer, name=name, version=version)
+
+    def append(
+        self,
+        rows: Union[pd.DataFrame, dict],
+        name=None,
+        version: Optional[Hashable] = None,
+    ):
+        """Append rows to a table.
+
+        If no rows are dropped from the table, the appended row range is recorded in `deltas`.
+
+        Args:
+            rows: DataFrame or dict of column name: array of rows to append.
+            name: Name of the table. Can be omitted for sources with a single table.
+            version: Optional version token supplied by the caller, included in the table's
+                hash.
+
+        """
+        name = self._item_name(name)
+        buffer = self.contents.get(name)
+        if buffer is None:
+            self.set(rows, name=name, version=version)
+            return
+
+        previous_hash = self.hashes[name]
+        start = len(buffer)
+        dropped = buffer.append(rows)
+        self._store(buffer, name, version)
+        if dropped:
+            self.deltas.pop(name, None)
+        else:
+            self._record_delta(name, previous_hash, start, len(buffer))
+        self._signal_updated(name)
+
+    def get(self, name: Optional[str] = None) -> Optional[pd.DataFrame]:
+        if self.empty:
+            return None
+        elif self.singular and name is None:
+            name = next(iter(self.keys()))
+
+        buffer = self.contents.get(name)
+        if buffer is None:
+            return None
+
+        # Tables are only copied out of the buffer once per version
+        h, frame = self._frames.get(name, (None, None))
+        if h != self.hashes[name]:
+            frame = buffer.to_frame()
+            self._frames[name] = (self.hashes[name], frame)
+
+        return frame
+
+    def hash_item(
+        self,
+        item,
+        version: Optional[Hashable] = None,
+        column_hashes: Optional[dict] = None,
+    ) -> str:
+        self._version += 1
+        tup = (self._token, self._version, version)
+        return str(hash_object(tup, method=self._hash_method))
+
+
+class FileTableSource(TableSource):
+    """Source for tables stored in Parquet or Feather files, which are loaded on first use.
+
+    Files are registered by name through `paths` or `register`, and loaded when a table is
+    first requested with `get`. Tables are hashed by file metadata (path, size, modification
+    time and, for Parquet, the file footer including row group statistics), without reading
+    the data. When the loaded tables exceed `max_bytes`, the least recently used tables are
+    unloaded and reloaded from file when requested again.
+
+    When only some columns of a table are requested, only these columns are read. The loaded
+    columns are extended when other columns are requested later.
+
+    Tables can also be set in memory with `set`, these are never unloaded. `items` and
+    `values` load tables one at a time as they are iterated.
+
+    Tables can be requested from multiple threads.
+
+    Requires `pyarrow`.
+
+    """
+
+    _type = "file_table"
+
+    paths = param.Dict(default={}, doc="Dictionary of table name: file path")
+
+    max_bytes = param.Integer(
+        None,
+        bounds=(0, None),
+        doc="Maximum total size of loaded tables in bytes. If None, tables stay loaded",
+    )
+
+    def __init__(self, **params):
+        if pa is None:
+            raise ModuleNotFoundError(
+                f"{self.__class__.__name__} requires 'pyarrow' to be installed"
+            )
+        super().__init__(**params)
+        self._loaded = OrderedDict()  # name: size in bytes, in order of last use
+        self._loaded_columns = {}  # name: columns read, None if all columns are read
+        self._lock = threading.RLock()  # guards loading and unloading of tables
+        for name, path in self.paths.items():
+            self.hashes[name] = self.hash_path(path)
+            self.column_hashes[name] = None
+
+    @property
+    def singular(self) -> bool:
+        return len(self.keys()) == 1
+
+    @property
+    def empty(self) -> bool:
+        return len(self.keys()) == 0
+
+    def keys(self) -> KeysView:
+        return self.hashes.keys()
+
+    def items(self) -> ItemsView:
+        return ItemsView(_LazyTables(self))
+
+    def values(self) -> ValuesView:
+        return ValuesView(_LazyTables(self))
+
+    def register(self, name: Hashable, path: Union[str, os.PathLike]) -> None:
+        """Register (or replace) a table stored in a file.
+
+        Args:
+            name: Name of the table.
+            path: Path to a Parquet (.parquet) or Feather (.feather, .arrow) file.
+
+        """
+        with self._lock:
+            self.paths[name] = path
+            self.hashes[name] = self.hash_path(path)
+            self.column_hashes[name] = None
+            self.deltas.pop(name, None)
+            self.contents.pop(name, None)
+            self._loaded.pop(name, None)
+            self._loaded_columns.pop(name, None)
+        self._signal_updated(name)
+
+    def set(self, item, name=None, version: Optional[Hashable] = None):
+        name = self._item_name(name)
+        with self._lock:
+            self.paths.pop(name, None)
+            self._loaded.pop(name, None)
+            self._loaded_columns.pop(name, None)
+        super().set(item, name=name, version=version)
+
+    def refresh(self) -> list:
+        """Rehash registered files and unload the tables whose file has changed.
+
+        Returns:
+            Names of the tables whose file has changed.
+
+        """
+        changed = []
+        with self._lock:
+            for name, path in self.paths.items():
+                h = self.hash_path(path)
+                if h != self.hashes.get(name):
+                    self.hashes[name] = h
+                    self.deltas.pop(name, None)
+                    self.unload(name)
+                    changed.append(name)
+
+        if changed:
+            self._signal_updated()
+        return changed
+
+    def get(
+        self, name: Optional[str] = None, columns: Optional[list] = None
+    ) -> Optional[pd.DataFrame]:
+        """Get a table, loading it from file if needed.
+
+        Args:
+            name: Name of the table. Can be omitted for sources with a single table.
+            columns: Columns to get. If None, all columns are returned. Columns which are not
+                in the table are ignored.
+
+        Returns:
+            The table.
+
+        """
+        if self.empty:
+            return None
+        elif self.singular and name is None:
+            name = next(iter(self.keys()))
+
+        with self._lock:
+            df = self.contents.get(name)
+            path, h = self.paths.get(name), self.hashes.get(name)
+            read = False
+            if path is not None:
+                loaded = self._loaded_columns.get(name, [])
+                if name not in self._loaded:
+                    read = columns
+                elif loaded is None or (columns is not None and set(columns) <= set(loaded)):
+                    self._loaded.move_to_end(name)
+                elif columns is None:
+                    read = None
+                else:
+                    read = loaded + [column for column in columns if column not in loaded]
+
+        if read is not False:
+            # Files are read outside the lock, such that tables are loaded concurrently.
+            # The table read is returned, also if another thread unloads it meanwhile
+            df = self.read(path, columns=read)
+            with self._lock:
+                # Not stored if the file was replaced or changed meanwhile
+                if (self.paths.get(name), self.hashes.get(name)) == (path, h):
+                    self.contents[name] = df
+                    self._loaded[name] = sizeof(df)
+                    self._loaded.move_to_end(name)
+                    self._loaded_columns[name] = read
+                    self._unload_idle()
+
+        if df is None or columns is None or list(df.columns) == list(columns):
+            return df
+
+        return df[[column for column in columns if column in df.columns]]
+
+    def unload(self, name: Hashable) -> None:
+        """Unload a file-backed table from memory, it is reloaded on the next `get`"""
+        with self._lock:
+            if self._loaded.pop(name, None) is not None:
+                self.contents.pop(name, None)
+                self._loaded_columns.pop(name, None)
+
+    def _unload_idle(self) -> None:
+        # The most recently used table is kept, also when it exceeds max_bytes by itself
+        if self.max_bytes is None:
+            return
+        while len(self._loaded) > 1 and sum(self._loaded.values()) > self.max_bytes:
+            self.unload(next(iter(self._loaded)))
+
+    @staticmethod
+    def read(path: Union[str, os.PathLike], columns: Optional[list] = None) -> pd.DataFrame:
+        """Read a table from a Parquet or Feather file.
+
+        Args:
+            path: Path of the file.
+            columns: Columns to read. If None, all columns are read. Columns which are not
+                in the file are ignored.
+
+        Returns:
+            The table.
+
+        """
+        path = Path(path)
+        if path.suffix == ".parquet":
+            if columns is not None:
+                names = pq.read_schema(path).names
+                columns = [column for column in columns if column in names]
+            table = pq.read_table(path, columns=columns, use_pandas_metadata=True)
+        else:
+            table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+            if columns is not None:
+                metadata = table.schema.pandas_metadata or {}
+                index_columns = [
+                    c for c in metadata.get("index_columns", []) if isinstance(c, str)
+                ]
+                names = table.schema.names
+                selected = [c for c in list(columns) + index_columns if c in names]
+                table = table.select(selected)
+
+        return table.to_pandas()
+
+    def hash_path(self, path: Union[str, os.PathLike]) -> str:
+        """Hash a file by its metadata.
+
+        Args:
+            path: Path of the file.
+
+        Returns:
+            Hash of path, size and modification time, and the footer of Parquet files.
+
+        """
+        path = Path(path)
+        stat = path.stat()
+        footer = None
+        if path.suffix == ".parquet":
+            footer = repr(pq.read_metadata(path).to_dict())
+
+        tup = (str(path.resolve()), stat.st_size, stat.st_mtime_ns, footer)
+        return str(hash_object(tup, method=self._hash_method))
+
+
+class _LazyTables(Mapping):
+    """Read-only mapping of the tables of a `FileTableSource`, loaded when accessed"""
+
+    def __init__(self, source: FileTableSource):
+        self.source = source
+
+    def __getitem__(self, name):
+        if name not in self.source.keys():
+            raise KeyError(name)
+        return self.source.get(name)
+
+    def __iter__(self):
+        return iter(list(self.source.keys()))
+
+    def __len__(self) -> int:
+        return len(self.source.keys())
+
+
+class DirectorySource(FileTableSource):
+    """Source for the Parquet or Feather files in a directory, which is watched for changes.
+
+    Files matching `pattern` are registered as tables named by their file name without suffix.
+    A background thread watches the directory, using inotify (through `watchdog`) if
+    available and by polling otherwise. Bursts of file events are debounced: once no
+    further changes occur for `debounce` seconds, new and changed files are rehashed and
+    unloaded, such that they are reloaded on their next `get`, and removed files are
+    unregistered. A single `updated` event is fired per debounce window.
+
+    Changes are applied where the watcher was started: when started from a Bokeh session,
+    on the session's event loop, and the watcher is stopped when the session is destroyed.
+    Otherwise, when started from a running asyncio event loop, changes are applied on that
+    loop. If neither is available, `updated` is fired on the watcher thread, such that
+    downstream transforms and views are also updated on that thread.
+
+    """
+
+    _type = "directory"
+
+    directory = param.String(doc="Path of the directory to watch")
+
+    pattern = param.String("*.parquet", doc="Glob pattern of the files to load")
+
+    debounce = param.Number(
+        0.5, bounds=(0, None), doc="Seconds without file changes before reloading"
+    )
+
+    poll_interval = param.Number(
+        1.0, bounds=(0, None), doc="Seconds between checks of the directory for changes"
+    )
+
+    watch = param.Boolean(True, doc="Start watching the directory on initialization")
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self._stats = {}  # name: (path, size, mtime) of registered files
+        self._event = threading.Event()  # Set by the observer on file events
+        self._stop = threading.Event()
+        self._thread = None
+        self._observer = None
+        self._doc = None
+        self._loop = None
+        self.scan()
+        if self.watch:
+            self.start()
+
+    def snapshot(self) -> dict:
+        """Dict of table name: (path, size, mtime) of the files matching `pattern`"""
+        snapshot = {}
+        for path in sorted(Path(self.directory).glob(self.pattern)):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # Removed while listing
+                continue
+            snapshot[path.stem] = (str(path), stat.st_size, stat.st_mtime_ns)
+
+        return snapshot
+
+    def scan(self) -> list:
+        """Register new and changed files and unregister removed files.
+
+        Returns:
+            Names of the tables which are added, changed or removed.
+
+        """
+        snapshot = self.snapshot()
+        changed = [name for name, stat in snapshot.items() if self._stats.get(name) != stat]
+        removed = [name for name in self._stats if name not in snapshot]
+
+        with self._lock:
+            for name in changed:
+                path = snapshot[name][0]
+                self.paths[name] = path
+                self.hashes[name] = self.hash_path(path)
+                self.column_hashes[name] = None
+                self.deltas.pop(name, None)
+                self.unload(name)
+            for name in removed:
+                self.unload(name)
+                for d in [self.paths, self.hashes, self.column_hashes, self.deltas]:
+                    d.pop(name, None)
+
+        self._stats = snapshot
+        if changed or removed:
+            self._signal_updated()
+
+        return changed + removed
+
+    def start(self) -> None:
+        """Start watching the directory on a background thread.
+
+        When called from a Bokeh session, `stop` is called when the session is destroyed.
+
+        """
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        doc = pn.state.curdoc
+        if doc is not None and doc.session_context:
+            self._doc = doc
+            doc.on_session_destroyed(self._session_destroyed)
+        else:
+            try:
+                self._loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._loop = None
+
+        if Observer is not None:
+            self._observer = Observer()
+            self._observer.schedule(_PatternHandler(self.pattern, self._event), self.directory)
+            self._observer.start()
+
+        self._thread = threading.Thread(
+            target=self._run, name=f"lumflux-{self.name}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching the directory"""
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._doc = None
+        self._loop = None
+
+    def _session_destroyed(self, session_context) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if not self._wait_for_change():
+                continue
+
+            # Wait until the directory is unchanged for the debounce window
+            snapshot = self.snapshot()
+            while not self._stop.wait(self.debounce):
+                current = self.snapshot()
+                if current == snapshot and not self._event.is_set():
+                    break
+                self._event.clear()
+                snapshot = current
+
+            if not self._stop.is_set():
+                self._dispatch(self.scan)
+
+    def _wait_for_change(self) -> bool:
+        if self._observer is not None:
+            # Also check for stop regularly
+            triggered = self._event.wait(self.poll_interval)
+            self._event.clear()
+            return triggered
+
+        self._stop.wait(self.poll_interval)
+        return self.snapshot() != self._stats
+
+    def _dispatch(self, callback) -> None:
+        doc, loop = self._doc, self._loop
+        if doc is not None:
+            # Thread-safe, runs the callback with the document lock held
+            doc.add_next_tick_callback(callback)
+        elif loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(callback)
+        else:
+            callback()
+
+
+class _PatternHandler(object):
+    """watchdog event handler which sets an event for changes to files matching a pattern"""
+
+    def __init__(self, pattern: str, event: threading.Event):
+        self.pattern = pattern
+        self.event = event
+
+    def dispatch(self, event) -> None:
+        paths = [getattr(event, "src_path", ""), getattr(event, "dest_path", "")]
+        if any(fnmatch.fnmatch(os.path.basename(str(p)), self.pattern) for p in paths if p):
+            self.event.set()
+
+
+class ConnectionPool(object):
+    """Pool of read-only database connections which can be used from multiple threads.
+
+    Connections are created when needed, up to `size` connections.
+
+    Args:
+        database: Path to the database file.
+        engine: Database engine, 'sqlite' or 'duckdb'.
+        size: Maximum number of connections.
+
+    """
+
+    def __init__(self, database: Union[str, os.PathLike], engine: str = "sqlite", size: int = 4):
+        self.database = Path(database)
+        self.engine = engine
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._count = 0
+        self._lock = threading.Lock()
+        self._root = None  # duckdb database connection from which cursors are created
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Context manager which takes a connection from the pool and returns it afterwards"""
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._count < self.size
+                self._count += create
+            connection = self._connect() if create else self._idle.get()
+
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def _connect(self) -> Any:
+        if self.engine == "sqlite":
+            uri = f"{self.database.resolve().as_uri()}?mode=ro"
+            return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+        with self._lock:
+            if self._root is None:
+                self._root = duckdb.connect(str(self.database), read_only=True)
+            return self._root.cursor()
+
+    def close(self) -> None:
+        """Close all idle connections"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+            self._count -= 1
+        if self._root is not None and self._count == 0:
+            self._root.close()
+            self._root = None
+
+
+class SQLSource(GenericSource):
+    """Source for tables queried from a SQLite or DuckDB database file.
+
+    Tables are defined by named queries which may contain named parameters (`:name` for
+    SQLite, `$name` for DuckDB), with the parameter values given per query in `parameters`.
+    Queries run on a pool of read-only connections, and results are cached by query,
+    parameters, filters and the modification time of the database file.
+
+    Filters are pushed down into the database as a WHERE clause on the query's result, see
+    `get` and `SQLFilterTransform`. Tables are hashed by their query and the state of the
+    database file, call `refresh` to signal updates when the file has changed.
+
+    """
+
+    _type = "sql"
+
+    database = param.String(doc="Path to the database file")
+
+    engine = param.Selector(default="sqlite", objects=["sqlite", "duckdb"])
+
+    queries = param.Dict(default={}, doc="Dictionary of table name: SQL query")
+
+    parameters = param.Dict(
+        default={}, doc="Dictionary of table name: dict of query parameter values"
+    )
+
+    pool_size = param.Integer(4, bounds=(1, None), doc="Maximum number of connections")
+
+    max_results = param.Integer(
+        32, bounds=(1, None), doc="Maximum number of query results to cache"
+    )
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        if self.engine == "duckdb" and duckdb is None:
+            raise ModuleNotFoundError(
+                f"{self.__class__.__name__} with the 'duckdb' engine requires 'duckdb' to be "
+                "installed"
+            )
+        self.pool = ConnectionPool(self.database, engine=self.engine, size=self.pool_size)
+        self._results = MemoryCache(max_items=self.max_results)
+        self._stamp = self.database_stamp()
+        for name in self.queries:
+            self._hash_query(name)
+
+    @property
+    def singular(self) -> bool:
+        return len(self.queries) == 1
+
+    @property
+    def empty(self) -> bool:
+        return len(self.queries) == 0
+
+    def keys(self) -> KeysView:
+        return self.queries.keys()
+
+    def set(self, item, name=None, version: Optional[Hashable] = None):
+        raise NotImplementedError(f"{self.__class__.__name__} does not support setting items")
+
+    def add_query(self, name: str, query: str, parameters: Optional[dict] = None) -> None:
+        """Add (or replace) a named query.
+
+        Args:
+            name: Name of the table.
+            query: SQL query.
+            parameters: Values of named parameters in the query.
+
+        """
+        self.queries[name] = query
+        self.parameters[name] = parameters or {}
+        self._hash_query(name)
+        self._signal_updated(name)
+
+    def refresh(self) -> bool:
+        """Rehash all tables if the database file has changed.
+
+        Returns:
+            `True` if the database file has changed.
+
+        """
+        stamp = self.database_stamp()
+        if stamp == self._stamp:
+            return False
+
+        self._stamp = stamp
+        for name in self.queries:
+            self._hash_query(name)
+        self._signal_updated()
+        return True
+
+    def database_stamp(self) -> tuple:
+        """Size and modification time of the database file, including its write-ahead log"""
+        stamp = []
+        # SQLite and DuckDB write-ahead logs
+        paths = [f"{self.database}", f"{self.database}-wal", f"{self.database}.wal"]
+        for path in map(Path, paths):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            stamp.append((path.name, stat.st_size, stat.st_mtime_ns))
+
+        return tuple(stamp)
+
+    def _hash_query(self, name: str) -> None:
+        query, parameters = self.queries[name], self.parameters.get(name, {})
+        tup = (self.database, self._stamp, query, tuple(sorted(parameters.items())))
+        self.hashes[name] = str(hash_object(tup, method=self._hash_method))
+        self.column_hashes[name] = None
+
+    def get(
+        self, name: Optional[str] = None, filters: Optional[dict] = None
+    ) -> Optional[pd.DataFrame]:
+        """Run the query of a table.
+
+        Args:
+            name: Name of the table. Can be omitted for sources with a single table.
+            filters: Dict of column: value to select rows of the result by. List values
+                select rows where the column has any of the values.
+
+        Returns:
+            The query result.
+
+        """
+        if self.empty:
+            return None
+        elif self.singular and name is None:
+            name = next(iter(self.keys()))
+
+        where, parameters = self._where(filters)
+        sql = f"SELECT * FROM ({self.queries[name]}) AS q{where}"
+        return self.query(sql, {**self.parameters.get(name, {}), **parameters})
+
+    def distinct(self, name: str, column: str, filters: Optional[dict] = None) -> list:
+        """Distinct values of a column of a table, in ascending order.
+
+        Args:
+            name: Name of the table.
+            column: Column to get distinct values of.
+            filters: Filters to apply before, see `get`.
+
+        Returns:
+            List of values.
+
+        """
+        where, parameters = self._where(filters)
+        column = self._quote(column)
+        sql = (
+            f"SELECT DISTINCT {column} FROM ({self.queries[name]}) AS q{where} "
+            f"ORDER BY {column}"
+        )
+        df = self.query(sql, {**self.parameters.get(name, {}), **parameters})
+        return df.iloc[:, 0].tolist()
+
+    def query(self, sql: str, parameters: Optional[dict] = None) -> pd.DataFrame:
+        """Run a query on a pooled connection, or return its cached result.
+
+        Args:
+            sql: SQL query.
+            parameters: Values of named parameters in the query.
+
+        Returns:
+            The query result.
+
+        """
+        parameters = parameters or {}
+        key = (sql, tuple(sorted(parameters.items(), key=str)), self.database_stamp())
+        with self._results.lock:
+            if key in self._results:
+                return self._results[key]
+
+        t0 = time.perf_counter()
+        with self.pool.connection() as connection:
+            if self.engine == "sqlite":
+                df = pd.read_sql_query(sql, connection, params=parameters)
+            else:
+                df = connection.execute(sql, parameters).df()
+        cost = time.perf_counter() - t0
 
+        with self._results.lock:
+            self._results.set(key, df, cost=cost)
+        return df
 
+    def _where(self, filters: Optional[dict]) -> tuple[str, dict]:
+        """WHERE clause and its parameters for filters on a query result"""
+        prefix = ":" if self.engine == "sqlite" else "$"
+        conditions, parameters = [], {}
+        for i, (column, value) in enumerate((filters or {}).items()):
+            column = self._quote(column)
+            if value is None:
+                conditions.append(f"{column} IS NULL")
+            elif isinstance(value, (list, tuple, set)):
+                names = [f"_filter_{i}_{j}" for j in range(len(value))]
+                parameters.update(zip(names, value))
+                placeholders = ", ".join(prefix + name for name in names)
+                conditions.append(f"{column} IN ({placeholders})" if names else "FALSE")
+            else:
+                parameters[f"_filter_{i}"] = value
+                conditions.append(f"{column} = {prefix}_filter_{i}")
 
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, parameters
 
+    @staticmethod
+    def _quote(identifier: str) -> str:
+        return '"' + str(identifier).replace('"', '""') + '"'
@@ -1,7 +1,11 @@
+import datetime
+import io
+import re
 from typing import Generator, Any, Type, TypeVar, Optional, Union, Callable, Literal
 
 import pandas as pd
 import numpy as np
+import param
 from matplotlib.colors import Colormap, Normalize
 import panel as pn
 
@@ -9,11 +13,129 @@ import hashlib
 
 from lumflux.widgets import WidgetView
 
+try:
+    import polars as pl
+except ModuleNotFoundError:
+    pl = None
 
-def hash_dataframe(df: pd.DataFrame, method: Literal["builtin", "md5"] = "builtin") -> str:
+try:
+    import pyarrow.csv as pa_csv
+except ModuleNotFoundError:
+    pa_csv = None
+
+
+HASH_METHODS = ["builtin", "md5", "blake2"]
+
+BACKENDS = ["pandas", "polars"]
+
+# polars methods whose output schema depends on the data, applied on collected DataFrames
+POLARS_EAGER_METHODS = {"pivot"}
+
+
+def get_hasher(method: Literal["md5", "blake2"]) -> "hashlib._Hash":
+    """Returns a new hashlib hash object for the given (stable) hash method"""
+    if method == "md5":
+        return hashlib.md5()
+    elif method == "blake2":
+        return hashlib.blake2b(digest_size=16)
+    else:
+        raise ValueError(f"Invalid method {method!r}, must be 'md5' or 'blake2'")
+
+
+def _digest(arr: np.ndarray) -> bytes:
+    """blake2 digest of the data buffer of an array"""
+    h = get_hasher("blake2")
+    h.update(memoryview(np.ascontiguousarray(arr)).cast("B"))
+    return h.hexdigest().encode("UTF-8")
+
+
+def encode(obj: Any) -> bytes:
+    """Canonical byte encoding of (nested) objects, used for stable hashing.
+
+    Unlike `hash`, the encoding does not depend on the interpreter session. Dicts and sets
+    are sorted, `Parameterized` objects are encoded by class and name, and functions and
+    classes by their qualified name. Arrays, Series and Indexes are encoded by their
+    values.
+
+    Args:
+        obj: Object to encode.
+
+    Returns:
+        Encoded object.
+
+    Raises:
+        TypeError: If the object has no stable encoding.
+
+    """
+    if obj is None or isinstance(obj, (bool, int, float, complex, str)):
+        return f"{type(obj).__name__}:{obj!r}".encode("UTF-8")
+    elif isinstance(obj, bytes):
+        return b"bytes:" + obj
+    elif isinstance(obj, np.generic):
+        return encode(obj.item())
+    elif isinstance(obj, (tuple, list)):
+        return b"(" + b",".join(encode(item) for item in obj) + b")"
+    elif isinstance(obj, dict):
+        items = sorted(encode(k) + b":" + encode(v) for k, v in obj.items())
+        return b"{" + b",".join(items) + b"}"
+    elif isinstance(obj, (set, frozenset)):
+        return b"{" + b",".join(sorted(encode(item) for item in obj)) + b"}"
+    elif isinstance(obj, slice):
+        return b"slice" + encode((obj.start, obj.stop, obj.step))
+    elif isinstance(obj, re.Pattern):
+        return b"re" + encode((obj.pattern, obj.flags))
+    elif isinstance(obj, param.Parameterized):
+        return f"{type(obj).__name__}:{obj.name}".encode("UTF-8")
+    elif isinstance(obj, pd.DataFrame):
+        return hash_dataframe(obj, method="blake2").encode("UTF-8")
+    elif isinstance(obj, (pd.Series, pd.Index)):
+        names = obj.names if isinstance(obj, pd.Index) else [obj.name]
+        metadata = (type(obj).__name__, str(obj.dtype), list(names))
+        row_hashes = pd.util.hash_pandas_object(obj).values
+        return encode(metadata) + _digest(row_hashes)
+    elif isinstance(obj, np.ndarray):
+        if obj.dtype.hasobject:
+            return b"ndarray" + encode((obj.shape, obj.tolist()))
+        return encode(("ndarray", obj.dtype.str, obj.shape)) + _digest(obj)
+    elif isinstance(obj, (datetime.date, datetime.time, datetime.timedelta)):
+        return f"{type(obj).__name__}:{obj!r}".encode("UTF-8")
+    elif isinstance(obj, np.dtype):
+        return f"dtype:{obj.str}".encode("UTF-8")
+    elif callable(obj) and hasattr(obj, "__qualname__") and "<" not in obj.__qualname__:
+        # Functions and classes; lambdas and local functions have no stable name
+        return f"callable:{obj.__module__}.{obj.__qualname__}".encode("UTF-8")
+    else:
+        raise TypeError(f"Cannot encode object of type {type(obj).__name__!r} for hashing")
+
+
+def hash_object(obj: Any, method: Literal["builtin", "md5", "blake2"] = "builtin") -> Union[int, str]:
+    """Hash a (nested) object.
+
+    Args:
+        obj: Object to hash. Must be hashable for the 'builtin' method.
+        method: Hashing method. The 'builtin' method uses `hash` and gives values
+            which change between interpreter sessions. The 'md5' and 'blake2' methods hash
+            the canonical encoding of the object and are stable between sessions.
+
+    Returns:
+        The hash value, an integer for the 'builtin' method, hex digest string otherwise.
+
+    """
+    if method == "builtin":
+        return hash(obj)
+
+    h = get_hasher(method)
+    h.update(encode(obj))
+
+    return h.hexdigest()
+
+
+def hash_dataframe(df: pd.DataFrame, method: Literal["builtin", "md5", "blake2"] = "builtin") -> str:
+    # uint64 hash per row; hashed as a single buffer rather than row by row
+    row_hashes = np.ascontiguousarray(pd.util.hash_pandas_object(df, index=True).values)
     if method == "builtin":
         tup = (
-            *pd.util.hash_pandas_object(df, index=True).values,
+            row_hashes.tobytes(),
             *df.columns,
             *df.columns.names,
             df.index.name,
@@ -21,27 +143,499 @@ def hash_dataframe(df: pd.DataFrame, method: Literal["builtin", "md5"] = "builti
 
         return str(hash(tup))
 
-    elif method == "md5":
-        pd_values = list(pd.util.hash_pandas_object(df, index=True).values)
+    elif method in ["md5", "blake2"]:
         if isinstance(df.columns, pd.MultiIndex):
             columns = [name for cols in df.columns for name in cols]
         else:
             columns = list(df.columns)
 
-        all_vals = pd_values + columns + list(df.index.names) + list(df.columns.names)
-        h = hashlib.md5()
-        for val in all_vals:
-            h.update(str(val).encode("UTF-8"))
+        metadata = columns + list(df.index.names) + list(df.columns.names)
+        h = get_hasher(method)
+        h.update(memoryview(row_hashes))
+        h.update(encode(metadata))
 
-        return h.digest().hex()
+        return h.hexdigest()
 
     else:
-        raise ValueError(f"Invalid method {method!r}, must be 'builtin' or 'md5'")
+        raise ValueError(
+            f"Invalid method {method!r}, must be 'builtin', 'md5' or 'blake2'"
+        )
+
+
+def hash_dataframe_sampled(
+    df: pd.DataFrame,
+    method: Literal["builtin", "md5", "blake2"] = "builtin",
+    n_samples: int = 1000,
+    block_size: int = 100,
+) -> str:
+    """Approximate hash of a dataframe from a subset of its rows.
+
+    The hash includes the shape and dtypes of the dataframe, the first and last
+    `block_size` rows and `n_samples` rows sampled at equidistant positions. Changes to
+    rows which are not sampled are not detected.
+
+    Args:
+        df: Dataframe to hash.
+        method: Hashing method, see `hash_dataframe`.
+        n_samples: Number of rows to sample at equidistant positions.
+        block_size: Number of rows at the head and tail of the dataframe to include.
+
+    Returns:
+        Hash of the dataframe.
+
+    """
+    n = len(df)
+    positions = np.unique(
+        np.concatenate(
+            [
+                np.arange(min(block_size, n)),
+                np.linspace(0, max(n - 1, 0), min(n_samples, n)).astype(int),
+                np.arange(max(n - block_size, 0), n),
+            ]
+        )
+    )
+    sample_hash = hash_dataframe(df.iloc[positions], method=method)
+    tup = (sample_hash, df.shape, tuple(str(dtype) for dtype in df.dtypes))
+
+    return str(hash_object(tup, method=method))
+
+
+def _hash_buffer(
+    arr: np.ndarray, metadata: tuple, method: Literal["builtin", "md5", "blake2"]
+) -> str:
+    """Hash a uint64 array of row hashes together with (hashable) metadata"""
+    arr = np.ascontiguousarray(arr)
+    if method == "builtin":
+        return str(hash((arr.tobytes(), metadata)))
+
+    h = get_hasher(method)
+    h.update(memoryview(arr))
+    h.update(encode(metadata))
+
+    return h.hexdigest()
+
+
+def hash_dataframe_columns(
+    df: pd.DataFrame, method: Literal["builtin", "md5", "blake2"] = "builtin"
+) -> Optional[dict[Any, str]]:
+    """Hash each column of a dataframe separately.
+
+    The index is hashed once and its hash is included in every column hash, together with
+    the column's name and dtype and the names of the column levels. A column hash therefore
+    changes when rows are added, removed or reordered, but not when another column changes.
+
+    Args:
+        df: Dataframe to hash.
+        method: Hashing method, see `hash_dataframe`.
+
+    Returns:
+        Dict of column name: hash, in the order of the columns, or `None` if the column
+        names are not unique.
+
+    """
+    if method not in HASH_METHODS:
+        raise ValueError(
+            f"Invalid method {method!r}, must be 'builtin', 'md5' or 'blake2'"
+        )
+    if not df.columns.is_unique:
+        return None
+
+    index_hash = _hash_buffer(
+        pd.util.hash_pandas_object(df.index).values,
+        tuple(df.index.names),
+        method,
+    )
+    column_names = tuple(df.columns.names)
+
+    column_hashes = {}
+    for i, column in enumerate(df.columns):
+        series = df.iloc[:, i]
+        row_hashes = pd.util.hash_pandas_object(series, index=False).values
+        metadata = (index_hash, column_names, column, str(series.dtype))
+        column_hashes[column] = _hash_buffer(row_hashes, metadata, method)
+
+    return column_hashes
+
+
+class IndexLookup(object):
+    """Lookup table for partial keys on a (Multi)Index.
+
+    The level codes of the index are sorted lexicographically once, such that all entries
+    matching a partial key form a contiguous range of the sorted table. Ranges are found
+    by binary search on the level codes. The labels of the next level within a range are
+    computed on first use and then kept.
+
+    Args:
+        index: Index to build the lookup table for.
+
+    """
+
+    def __init__(self, index: pd.Index):
+        if not isinstance(index, pd.MultiIndex):
+            index = pd.MultiIndex.from_arrays([index])
+        self.levels = index.levels
+        self._labels = [level.tolist() for level in index.levels]
+        codes = np.column_stack([np.asarray(c) for c in index.codes])
+        # Sort by the first level first; stable such that positions are ascending in ties
+        self.order = np.lexsort(codes.T[::-1])
+        # One contiguous row of sorted codes per level
+        self.codes = np.ascontiguousarray(codes[self.order].T)
+        self._children = {}
+
+    def children(
+        self, start: int, stop: int, depth: int
+    ) -> dict[Any, tuple[int, int, int]]:
+        """Labels on level `depth` in a range of the sorted table.
+
+        Returns:
+            Dict of label: (start, stop, first) with the subrange of each label and its
+            first position in the index, in order of first appearance in the index.
+
+        """
+        if (start, stop, depth) in self._children:
+            return self._children[start, stop, depth]
+
+        column = self.codes[depth, start:stop]
+        starts = np.flatnonzero(np.diff(column)) + 1
+        starts = np.concatenate([[0], starts]) if len(column) else starts
+        stops = np.append(starts[1:], len(column))
+        first = np.minimum.reduceat(self.order[start:stop], starts) if len(column) else starts
+
+        children = {}
+        for i in np.argsort(first, kind="stable"):
+            code = column[starts[i]]
+            label = np.nan if code == -1 else self._labels[depth][code]
+            children[label] = (start + starts[i], start + stops[i], first[i])
+
+        self._children[start, stop, depth] = children
+        return children
+
+    def ranges(self, key: list) -> list[tuple[int, int]]:
+        """Ranges of the sorted table matching a partial key on the first levels.
+
+        Args:
+            key: List of labels, one for each of the first levels. `slice(None)` selects
+                all labels on a level.
+
+        Returns:
+            List of (start, stop) ranges.
+
+        """
+        ranges = [(0, self.codes.shape[1])]
+        for depth, label in enumerate(key):
+            if isinstance(label, slice):
+                ranges = [
+                    (child_start, child_stop)
+                    for start, stop in ranges
+                    for child_start, child_stop, _ in self.children(
+                        start, stop, depth
+                    ).values()
+                ]
+                continue
+
+            try:
+                code = self.levels[depth].get_loc(label)
+            except KeyError:
+                return []
+            new_ranges = []
+            for start, stop in ranges:
+                column = self.codes[depth, start:stop]
+                lo = np.searchsorted(column, code, side="left")
+                hi = np.searchsorted(column, code, side="right")
+                if hi > lo:
+                    new_ranges.append((start + lo, start + hi))
+            ranges = new_ranges
+
+        return ranges
+
+    def options(self, key: list) -> list:
+        """Labels on the level following `key` of the entries matching `key`.
+
+        Labels are returned in order of first appearance in the index.
+
+        """
+        depth = len(key)
+        first = {}
+        for start, stop in self.ranges(key):
+            for label, (_, _, pos) in self.children(start, stop, depth).items():
+                first[label] = min(pos, first.get(label, pos))
+
+        return sorted(first, key=first.get)
+
+    def positions(self, key: list) -> np.ndarray:
+        """Ascending integer positions in the index of the entries matching `key`"""
+        ranges = self.ranges(key)
+        if not ranges:
+            return np.array([], dtype=int)
+        return np.sort(np.concatenate([self.order[start:stop] for start, stop in ranges]))
 
 
 T = TypeVar('T')
 
 
+class RingBuffer(object):
+    """Column-oriented buffer of table rows with a fixed capacity.
+
+    Columns are stored in preallocated arrays, such that appending rows takes time proportional
+    to the number of rows appended. When the buffer is full, appended rows replace the oldest
+    rows. Rows are labelled by their number in the stream of appended rows.
+
+    Args:
+        capacity: Maximum number of rows.
+
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.columns = {}
+        self.count = 0  # Total number of rows appended
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, rows: Union[pd.DataFrame, dict]) -> int:
+        """Append rows to the buffer.
+
+        Args:
+            rows: DataFrame or dict of column name: array of rows to append. The first rows
+                appended determine the columns. Columns are widened to the common dtype
+                when rows of a different dtype are appended, and strings are stored as
+                objects.
+
+        Returns:
+            Number of rows dropped from the buffer.
+
+        Raises:
+            ValueError: If the columns do not match the columns of the buffer, or if the
+                dtype of appended rows has no common dtype with their column.
+
+        """
+        values = {column: self._as_array(rows[column]) for column in rows}
+        if not self.columns:
+            self.columns = {
+                column: np.empty(self.capacity, dtype=arr.dtype)
+                for column, arr in values.items()
+            }
+        elif values.keys() != self.columns.keys():
+            raise ValueError(
+                f"Appended columns {list(values)} do not match {list(self.columns)}"
+            )
+
+        for column, new in values.items():
+            arr = self.columns[column]
+            if np.can_cast(new.dtype, arr.dtype, "safe"):
+                continue
+            try:
+                dtype = np.result_type(arr.dtype, new.dtype)
+            except TypeError:
+                raise ValueError(
+                    f"Cannot append rows of dtype {new.dtype} to column {column!r} of "
+                    f"dtype {arr.dtype}"
+                ) from None
+            self.columns[column] = arr.astype(dtype)
+
+        n = len(next(iter(values.values()))) if values else 0
+        dropped = max(len(self) + n - self.capacity, 0)
+        # Only the last rows fit
+        skip = max(n - self.capacity, 0)
+        position = (self.count + skip) % self.capacity
+        n_head = min(n - skip, self.capacity - position)
+        for column, arr in self.columns.items():
+            new = values[column][skip:]
+            arr[position : position + n_head] = new[:n_head]
+            arr[: len(new) - n_head] = new[n_head:]
+
+        self.count += n
+        return dropped
+
+    @staticmethod
+    def _as_array(values: Any) -> np.ndarray:
+        # Fixed-width numpy strings would truncate longer strings appended later
+        arr = np.asarray(values)
+        return arr.astype(object) if arr.dtype.kind in "US" else arr
+
+    def to_frame(self) -> pd.DataFrame:
+        """Returns the rows in the buffer as DataFrame, indexed by row number"""
+        n = len(self)
+        position = self.count % self.capacity
+        if self.count <= self.capacity:
+            data = {column: arr[:n].copy() for column, arr in self.columns.items()}
+        else:
+            data = {
+                column: np.concatenate([arr[position:], arr[:position]])
+                for column, arr in self.columns.items()
+            }
+
+        return pd.DataFrame(data, index=pd.RangeIndex(self.count - n, self.count))
+
+
+def is_polars(data: Any) -> bool:
+    """Returns `True` if `data` is a polars DataFrame or LazyFrame"""
+    return pl is not None and isinstance(data, (pl.DataFrame, pl.LazyFrame))
+
+
+def to_polars(data: Union[pd.DataFrame, "pl.DataFrame", "pl.LazyFrame"]) -> "pl.LazyFrame":
+    """Convert data to a polars LazyFrame.
+
+    As polars has no index, a pandas index is included as (leading) column(s), unless it is a
+    default `RangeIndex`.
+
+    Args:
+        data: pandas or polars dataframe.
+
+    Returns:
+        LazyFrame of the data.
+
+    """
+    if pl is None:
+        raise ModuleNotFoundError("The 'polars' backend requires 'polars' to be installed")
+    if isinstance(data, pl.LazyFrame):
+        return data
+    elif isinstance(data, pl.DataFrame):
+        return data.lazy()
+
+    include_index = not isinstance(data.index, pd.RangeIndex)
+    return pl.from_pandas(data, include_index=include_index).lazy()
+
+
+def to_pandas(data: Any) -> Any:
+    """Convert polars data to a pandas DataFrame, other data is returned as is"""
+    if pl is None:
+        return data
+    elif isinstance(data, pl.LazyFrame):
+        return data.collect().to_pandas()
+    elif isinstance(data, pl.DataFrame):
+        return data.to_pandas()
+    else:
+        return data
+
+
+def apply_polars(
+    data: Union[pd.DataFrame, "pl.DataFrame", "pl.LazyFrame"],
+    steps: list[tuple[str, list, dict]],
+    lazy: bool = False,
+) -> Union["pl.DataFrame", "pl.LazyFrame"]:
+    """Apply a sequence of polars methods to data.
+
+    Methods are called on a LazyFrame such that polars can optimize the query as a whole.
+    Methods which are only available on DataFrames or whose output columns depend on the
+    data (eg `pivot`) collect the query first.
+
+    Args:
+        data: Data to apply the methods to.
+        steps: List of (method name, args, kwargs) tuples.
+        lazy: If `True`, return the uncollected LazyFrame.
+
+    Returns:
+        LazyFrame if `lazy`, otherwise the collected DataFrame.
+
+    """
+    lf = to_polars(data)
+    for name, args, kwargs in steps:
+        if hasattr(lf, name) and name not in POLARS_EAGER_METHODS:
+            lf = getattr(lf, name)(*args, **kwargs)
+        else:
+            lf = getattr(lf.collect(), name)(*args, **kwargs).lazy()
+
+    return lf if lazy else lf.collect()
+
+
+class _ProgressReader(io.BytesIO):
+    """Bytes buffer which reports the fraction of bytes read"""
+
+    def __init__(self, data: bytes, progress: Optional[Callable[[float], None]]):
+        super().__init__(data)
+        self._size = max(len(data), 1)
+        self._progress = progress
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        data = super().read(size)
+        if self._progress is not None:
+            self._progress(self.tell() / self._size)
+        return data
+
+
+def read_csv_bytes(
+    data: bytes,
+    progress: Optional[Callable[[float], None]] = None,
+    index_col: Optional[Union[int, str]] = None,
+    sep: str = ",",
+    block_size: int = 1 << 24,
+) -> pd.DataFrame:
+    """Parse CSV data in blocks.
+
+    Uses the multithreaded pyarrow CSV reader if available, the pandas reader otherwise.
+
+    Args:
+        data: CSV file contents.
+        progress: Callback called with the fraction of data read after reading each block.
+        index_col: Position or name of the column to use as index.
+        sep: Field delimiter.
+        block_size: Number of bytes read per block.
+
+    Returns:
+        Parsed dataframe.
+
+    """
+    buffer = _ProgressReader(data, progress)
+    if pa_csv is None:
+        df = pd.read_csv(buffer, sep=sep, index_col=index_col)
+    else:
+        table = pa_csv.read_csv(
+            buffer,
+            read_options=pa_csv.ReadOptions(block_size=block_size),
+            parse_options=pa_csv.ParseOptions(delimiter=sep),
+        )
+        df = table.to_pandas()
+        if index_col is not None:
+            column = df.columns[index_col] if isinstance(index_col, int) else index_col
+            df = df.set_index(column)
+
+    return df
+
+
+def downcast_dtypes(
+    df: pd.DataFrame, categorical_threshold: Optional[float] = 0.5
+) -> pd.DataFrame:
+    """Reduce the memory footprint of a dataframe.
+
+    Integer columns are downcast to the smallest integer type holding their values, float
+    columns to float32 if this does not change their values. String columns with few unique
+    values are converted to categoricals.
+
+    Args:
+        df: Dataframe to downcast.
+        categorical_threshold: Maximum ratio of unique values to rows for string columns to
+            be converted to categoricals. If None, no columns are converted.
+
+    Returns:
+        Downcast dataframe.
+
+    """
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_integer_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            columns[column] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series) and series.dtype != np.float32:
+            values = series.to_numpy(dtype=np.float32)
+            if np.array_equal(values, series.to_numpy(), equal_nan=True):
+                columns[column] = series.astype(np.float32)
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            if categorical_threshold is not None and len(series):
+                if series.nunique() <= categorical_threshold * len(series):
+                    columns[column] = series.astype("category")
+
+    if not columns:
+        return df
+
+    df = df.copy(deep=False)
+    for column, series in columns.items():
+        df[column] = series
+
+    return df
+
+
 def gen_subclasses(cls: Type[T]) -> Generator[Type[T], None, None]:
     """Generator yielding subclasses of `cls`.
 
@@ -123,6 +717,8 @@ def make_tuple(item: Any) -> Any:
         return tuple(make_tuple(i) for i in item)
     elif isinstance(item, dict):
         return tuple((key, make_tuple(value)) for key, value in item.items())
+    elif pl is not None and isinstance(item, pl.Expr):  # unhashable, keyed by serialization
+        return item.meta.serialize()
     else:
         return item
 
@@ -1,6 +1,10 @@
+import asyncio
 import itertools
+import threading
+import time
 import warnings
-from typing import Any
+from concurrent.futures import Executor
+from typing import Any, Optional
 
 import numpy as np
 import pandas as pd
@@ -8,9 +12,31 @@ import panel as pn
 import param
 from param.parameterized import default_label_formatter
 
-from lumflux.sources import Source
-from lumflux.cache import Cache
-from lumflux.support import make_tuple
+try:
+    import polars as pl
+except ModuleNotFoundError:
+    pl = None
+
+from lumflux.sources import Source, FileTableSource, SQLSource
+from lumflux.cache import Cache, MemoryCache
+from lumflux.support import (
+    make_tuple,
+    hash_object,
+    HASH_METHODS,
+    BACKENDS,
+    IndexLookup,
+    apply_polars,
+    to_pandas,
+    to_polars,
+)
+
+# pandas methods which transform each row independently of the other rows, with their
+# default axis. Transforms applying only these methods are incremental
+ROW_WISE_FUNCTIONS = {"query", "dropna", "filter", "rename", "astype", "round", "abs", "clip"}
+
+# Per thread time spent getting source data, excluded from the compute cost of transforms
+_timing = threading.local()
+
 
 # ABC
 class Transform(param.Parameterized):
@@ -26,12 +52,76 @@ class Transform(param.Parameterized):
         doc="event gets triggered when widgets are changed and the controller needs to redraw them"
     )
 
-    _hash = param.Integer(doc="Hash of current transform state")
+    _hash = param.Parameter(doc="Hash of current transform state")
+
+    _hash_method = param.Selector(
+        default="builtin",
+        objects=HASH_METHODS,
+        doc="Method used to hash the transform. 'md5' and 'blake2' are stable between sessions",
+    )
 
     _cache = param.ClassSelector(default=Cache(), class_=Cache)
 
+    # Parameters which do not affect the hash and do not invalidate it when set
+    _hash_excluded = ["updated", "redrawn", "widgets", "_hash", "_cache"]
+
     def __init__(self, **params):
         super().__init__(**params)
+        self._cached_hash = None
+        self._invalidations = 0  # number of hash invalidations, to detect changes
+        self._scheduler = None
+        self._dependents = []
+        self._upstream = []
+        self._upstream_watchers = []
+
+        # Invalidation watchers run before param.depends watchers (precedence -1), such
+        # that these never see a stale hash
+        parameters = [p for p in self.param if p not in self._hash_excluded]
+        self.param._watch(
+            self._invalidate_hash, parameters, onlychanged=False, precedence=-2
+        )
+        self._watch_upstream()
+
+    @property
+    def upstream(self) -> list:
+        """Sources or transforms the transform takes as input"""
+        source = getattr(self, "source", None)
+        return [] if source is None else [source]
+
+    def _watch_upstream(self):
+        """Register with upstream objects to be invalidated and updated when they change"""
+        for obj in self._upstream:
+            if isinstance(obj, Transform):
+                obj._dependents.remove(self)
+        for watcher in self._upstream_watchers:
+            watcher.inst.param.unwatch(watcher)
+
+        self._upstream = self.upstream
+        self._upstream_watchers = []
+        for obj in self._upstream:
+            if isinstance(obj, Transform):
+                obj._dependents.append(self)
+            else:
+                watcher = obj.param._watch(
+                    self._invalidate_hash, ["updated"], precedence=-2
+                )
+                self._upstream_watchers.append(watcher)
+            watcher = obj.param.watch(self._upstream_updated, ["updated"])
+            self._upstream_watchers.append(watcher)
+
+    def _upstream_updated(self, *events):
+        # With a scheduler attached, updates are called by the scheduler instead
+        if self._scheduler is None:
+            self.update()
+
+    def _invalidate_hash(self, *events):
+        if any(event.name in ["source", "sources"] for event in events):
+            self._watch_upstream()
+
+        self._cached_hash = None
+        self._invalidations += 1
+        for transform in self._dependents:
+            transform._invalidate_hash()
 
     # perhaps htey should all be private to prevent namespace collision with filter options
     @property
@@ -48,11 +138,67 @@ class Transform(param.Parameterized):
             if not (item.startswith("_") or item in excluded)
         )
 
+    @property
+    def column_hashes(self):
+        """Dict of hashes of the individual columns of the output, `None` if unknown"""
+        return None
+
+    @property
+    def cached(self) -> bool:
+        """Whether results of `get` are stored in the cache"""
+        return False
+
+    def input_columns(self, columns: Optional[list]) -> Optional[list]:
+        """Columns of the source data needed to produce the given output columns.
+
+        Args:
+            columns: Columns of the output which are used, `None` if all are used.
+
+        Returns:
+            List of source columns needed, or `None` if all columns are needed or the
+            columns cannot be determined.
+
+        """
+        return None
+
+    @property
+    def delta(self) -> Optional[tuple[Any, int, int]]:
+        """Rows appended to the output, as (previous hash, start, stop).
+
+        The current output equals the output of the transform with the previous hash, with
+        rows [start, stop) appended. `None` if the output was not updated by appending rows.
+
+        """
+        return None
+
     @property
     def hash(self):
-        tup = (*self.hash_key, self.source_hash)
+        """Hash of the transform and its source(s).
+
+        The hash is cached and invalidated when parameters are set or upstream sources
+        or transforms change. Parameter values which are modified in-place require a call
+        to `param.trigger` to invalidate the hash.
+
+        """
+        if self._cached_hash is None:
+            tup = (*self.hash_key, self.source_hash)
+            self._cached_hash = hash_object(tup, method=self._hash_method)
 
-        return hash(tup)
+        return self._cached_hash
+
+    async def aget(self, executor: Optional[Executor] = None) -> Any:
+        """Awaitable version of `get` which runs `get` on an executor.
+
+        Args:
+            executor: Executor to run on. If `None`, the event loop's default executor
+                is used.
+
+        Returns:
+            The transform's data.
+
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.get)
 
     def update_hash(self):
         if self.hash == self._hash:
@@ -74,6 +220,10 @@ class MultiTransform(Transform):
 
     sources = param.Dict(doc="Dict of sources the transform takes as input")
 
+    @property
+    def upstream(self) -> list:
+        return list((self.sources or {}).values())
+
     @property
     def source_hash(self):
         return tuple(source.hash for source in self.sources.values())
@@ -92,9 +242,6 @@ class SelectTransform(MultiTransform):
 
     def __init__(self, **params):
         super().__init__(**params)
-        for k, src in self.sources.items():
-            src.param.watch(self.update, ["updated"])
-
         self.labels = self.labels or list(self.sources.keys())
         self.param["value"].objects = self.labels
         if not self.value:
@@ -134,6 +281,13 @@ class GetItemTransform(Transform):
       The item to select""",
     )
 
+    columns = param.List(
+        default=None,
+        allow_None=True,
+        precedence=-1,
+        doc="Columns to read from file-backed sources. If None, all columns are read",
+    )
+
     def __init__(self, options=None, **params):
         self.options = options
         super().__init__(**params)
@@ -146,15 +300,38 @@ class GetItemTransform(Transform):
     # todo allow auto generate widgets as in control panels /  views
 
     def get(self) -> Any:
+        # Only file-backed sources benefit from reading a subset of columns
+        if self.columns is not None and isinstance(self.source, FileTableSource):
+            return self.source.get(self.item, columns=self.columns)
+
         df = self.source.get(
             self.item
         )
         return df
 
+    def input_columns(self, columns: Optional[list]) -> Optional[list]:
+        return columns
+
     @property
     def source_hash(self):
         # todo update for len 1 sources
-        return self.source.hashes.get(self.item, hash(None))
+        return self.source.hashes.get(self.item)
+
+    @property
+    def column_hashes(self):
+        return self.source.column_hashes.get(self.item)
+
+    @property
+    def delta(self) -> Optional[tuple[Any, int, int]]:
+        delta = getattr(self.source, "deltas", {}).get(self.item)
+        if delta is None:
+            return None
+
+        previous_source_hash, start, stop = delta
+        previous_hash = hash_object(
+            (*self.hash_key, previous_source_hash), method=self._hash_method
+        )
+        return previous_hash, start, stop
 
     def _update_options(self):
         # options = self.source.get_tables()
@@ -165,13 +342,112 @@ class GetItemTransform(Transform):
         if not self.item and options:
             self.item = options[0]
 
-    @param.depends("source.updated", "item", watch=True)
+    @param.depends("item", watch=True)
     def update(self):
         self._update_options()
         if self.update_hash():
             self.updated = True
 
 
+class SQLFilterTransform(Transform):
+    """transform which selects rows of a `SQLSource` table with cascading selectors.
+
+    Like `CrossSectionTransform` along rows, but the selection is pushed down into the
+    database as a WHERE clause, such that only the selected rows are loaded. Options of each
+    selector are the distinct values of its column, given the selection of the previous
+    selectors.
+
+    """
+
+    _type = "sql_filter"
+
+    source = param.ClassSelector(class_=SQLSource)
+
+    item = param.String(None, doc="Name of the table of the source")
+
+    columns = param.List(default=[], doc="Columns to select rows by")
+
+    key = param.List(default=[], doc="Selected values of the columns")
+
+    names = param.List(None, doc="List of label names for widgets")
+
+    empty_select = param.Boolean(
+        default=False,
+        doc="Add an option to selectors to select all values of the column",
+    )
+
+    _all = "None"  # Option label which selects all values, as in CrossSectionTransform
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        names = self.names or self.columns
+        self.widgets = {
+            name: pn.widgets.Select(name=default_label_formatter(name)) for name in names
+        }
+        self.selectors = list(self.widgets.values())
+        self._refreshing = False
+        for selector in self.selectors:
+            selector.param.watch(self._selector_changed, ["value"], onlychanged=True)
+        self.update()
+
+    @property
+    def source_hash(self):
+        return self.source.hashes.get(self.item)
+
+    @property
+    def filters(self) -> dict:
+        """Dict of column: selected value pushed down to the source"""
+        return {
+            column: value
+            for column, value in zip(self.columns, self.key)
+            if value != self._all
+        }
+
+    def get(self) -> Optional[pd.DataFrame]:
+        return self.source.get(self.item, filters=self.filters)
+
+    def input_columns(self, columns: Optional[list]) -> Optional[list]:
+        return columns
+
+    def _refresh_options(self, start: int = 0) -> None:
+        """Update options and values of the selectors from `start` onwards and set `key`"""
+        key = [selector.value for selector in self.selectors[:start]]
+        self._refreshing = True
+        try:
+            for column, selector in zip(self.columns[start:], self.selectors[start:]):
+                filters = {
+                    c: v for c, v in zip(self.columns, key) if v != self._all
+                }
+                options = self.source.distinct(self.item, column, filters=filters)
+                if self.empty_select:
+                    options = [self._all] + options
+                value = selector.value if selector.value in options else None
+                if value is None and options:
+                    value = options[0]
+                selector.options = options
+                selector.value = value
+                key.append(value)
+        finally:
+            self._refreshing = False
+
+        self.key = key
+
+    def _selector_changed(self, *events):
+        if self._refreshing:
+            return
+        start = self.selectors.index(events[0].obj) + 1
+        self._refresh_options(start)
+        if self.update_hash():
+            self.updated = True
+
+    def update(self):
+        if self.source.empty or self.item not in self.source.keys():
+            return
+        self._refresh_options()
+        if self.update_hash():
+            self.updated = True
+
+
 class AppTransform(Transform):
     """transform which acts on previous transforms in a chain. source is also a transform"""
 
@@ -179,20 +455,260 @@ class AppTransform(Transform):
 
     source = param.ClassSelector(class_=Transform)
 
+    lazy = param.Boolean(
+        default=False,
+        doc="Do not cache results. Downstream transforms apply this transform fused with "
+            "their own, such that no intermediate result is stored. Only transforms which "
+            "implement `apply` (see `fusable`) are fused",
+    )
+
+    backend = param.Selector(
+        default="pandas",
+        objects=["pandas"],
+        doc="Dataframe library used to apply the transform. Input data is converted to pandas "
+            "for the 'pandas' backend",
+    )
+
+    def __init__(self, **params):
+        # (source hash, hash) of the last result, and (hash, previous hash, start, stop) of
+        # the last result which was computed by appending rows
+        self._computed = None
+        self._appended = None
+        super().__init__(**params)
+
+    @property
+    def source_hash(self):
+        # Only hash the columns which are read if the source has per-column hashes
+        column_hashes = self.source.column_hashes
+        if column_hashes is None:
+            return self.source.hash
+
+        columns = self.columns_read(list(column_hashes))
+        if columns is None:
+            return self.source.hash
+
+        return tuple((column, column_hashes[column]) for column in columns)
+
+    def columns_read(self, columns: list) -> Optional[list]:
+        """Columns of the source data read by the transform.
+
+        Args:
+            columns: Columns of the source data.
+
+        Returns:
+            List of columns read, or `None` if the transform reads all columns or the
+            columns cannot be determined.
+
+        """
+        return None
+
     def transform(self):
-        """get source data, apply transform, return result"""
-        return self.source.get()
+        """get source data, apply transform, return result
+
+        Lazy upstream transforms are applied together with this transform on the data of
+        the first source which is not lazy or not fusable.
+
+        """
+        plan = [self]
+        source = self.source
+        while isinstance(source, AppTransform) and source.lazy and source.fusable:
+            plan.append(source)
+            source = source.source
+
+        return self._apply_plan(plan, self._get_source(source))
+
+    @staticmethod
+    def _apply_plan(plan: list, df):
+        """Apply transforms in `plan`, given in reverse order of application, to `df`"""
+        for transform in reversed(plan):
+            if transform.backend == "pandas":
+                df = to_pandas(df)
+            df = transform.apply(df)
+
+        return df
+
+    def apply(self, df):
+        """apply the transform to the source data"""
+        return df
+
+    @property
+    def cached(self) -> bool:
+        return not self.lazy and type(self._cache) is not Cache
+
+    @property
+    def fusable(self) -> bool:
+        """Whether the transform can be applied fused with other transforms.
+
+        Fused transforms are applied by their `apply` method. Subclasses which override
+        `transform` instead are not fusable.
+
+        """
+        return type(self).transform is AppTransform.transform
+
+    @property
+    def incremental(self) -> bool:
+        """Whether rows appended to the source can be transformed on their own.
+
+        Incremental transforms apply the transform only to rows appended to the source
+        (see `delta`) and append the result to their previous result.
+
+        """
+        return False
+
+    def apply_appended(self, previous: pd.DataFrame, rows: pd.DataFrame, start: int):
+        """Append transformed rows to the previous result.
+
+        Args:
+            previous: Previous result of the transform.
+            rows: Rows appended to the source data.
+            start: Row number of the first appended row in the source data.
+
+        Returns:
+            Result of the transform applied to the source data including the new rows.
+
+        """
+        return pd.concat([previous, self.apply(rows)])
+
+    @property
+    def delta(self) -> Optional[tuple[Any, int, int]]:
+        if self._appended is None or self._appended[0] != self.hash:
+            return None
+        return self._appended[1:]
+
+    @property
+    def appendable(self) -> bool:
+        """Whether the result may be computed by `transform_appended`.
+
+        Requires an incremental, cached transform with a previous result, whose source is
+        not lazy.
+
+        """
+        source = self.source
+        if not self.incremental or not self.cached or self._computed is None:
+            return False
+        elif self.backend != "pandas":
+            return False
+        return not (isinstance(source, AppTransform) and source.lazy)
+
+    def transform_appended(self, df: Any) -> Optional[pd.DataFrame]:
+        """Transform only the rows appended to the source since the previous result.
+
+        Args:
+            df: Current source data.
+
+        Returns:
+            The result, or `None` if the source data was not updated by appending rows to
+            the data of the previous result.
+
+        """
+        # The delta of transforms is only known once their data is computed
+        delta = self.source.delta
+        previous_source_hash, previous_hash = self._computed
+        if not isinstance(df, pd.DataFrame) or delta is None:
+            return None
+        elif delta[0] != previous_source_hash:
+            return None
+
+        with self._cache.lock:
+            if previous_hash not in self._cache:
+                return None
+            previous = self._cache[previous_hash]
+
+        start, stop = delta[1:]
+        data = self.apply_appended(previous, df.iloc[start:stop], start)
+        self._appended = (self.hash, previous_hash, len(previous), len(data))
+
+        return data
+
+    @staticmethod
+    def _get_source(source):
+        """Get the data of a source, timing it as upstream time of the compute cost"""
+        t0 = time.perf_counter()
+        data = source.get()
+        _timing.upstream = getattr(_timing, "upstream", 0.0) + time.perf_counter() - t0
+        return data
+
+    def _compute(self) -> tuple[Any, float]:
+        """Compute the result.
+
+        Returns:
+            Tuple of the result and its cost, the time spent computing it excluding the
+            time spent getting source data.
+
+        """
+        outer = getattr(_timing, "upstream", 0.0)
+        _timing.upstream = 0.0
+        t0 = time.perf_counter()
+        try:
+            data = None
+            if self.appendable:
+                # Source data is fetched once, for both the incremental and full paths
+                df = self._get_source(self.source)
+                data = self.transform_appended(df)
+                if data is None:
+                    self._appended = None
+                    if self.fusable:
+                        data = self._apply_plan([self], df)
+                    else:
+                        data = self.transform()
+            else:
+                self._appended = None
+                data = self.transform()
+        finally:
+            cost = time.perf_counter() - t0 - _timing.upstream
+            _timing.upstream = outer
+
+        return data, cost
 
     def get(self):
         """method called to get the dataframe"""
-        if self.hash in self._cache:
-            return self._cache[self.hash]
-        else:
-            data = self.transform()
-            self._cache[self.hash] = data
-            return data
+        if self.lazy:
+            return self.transform()
+
+        key = self.hash
+        computed = (self.source.hash, key)
+        with self._cache.lock:
+            if key in self._cache:
+                self._computed = computed
+                return self._cache[key]
+
+        invalidations = self._invalidations
+        data, cost = self._compute()
+        self._store(data, computed, invalidations, cost)
+        return data
+
+    async def aget(self, executor: Optional[Executor] = None) -> Any:
+        if self.lazy:
+            return await super().aget(executor)
+
+        key = self.hash
+        computed = (self.source.hash, key)
+        with self._cache.lock:
+            if key in self._cache:
+                self._computed = computed
+                return self._cache[key]
+
+        loop = asyncio.get_running_loop()
+        invalidations = self._invalidations
+        data, cost = await loop.run_in_executor(executor, self._compute)
+        self._store(data, computed, invalidations, cost)
+        return data
+
+    def _store(self, data, computed: tuple, invalidations: int, cost: float) -> None:
+        """Cache a computed result under its hash.
+
+        The result is discarded if the hash was invalidated while it was computed, as
+        the transform may then have read parameters or source data of a different hash.
+
+        """
+        if self._invalidations != invalidations:
+            self._appended = None
+            return
+
+        with self._cache.lock:
+            self._cache.set(computed[1], data, cost=cost)
+        self._computed = computed
 
-    @param.depends("source.updated", watch=True)
     def update(self):
         self.updated = True
 
@@ -225,38 +741,92 @@ class CrossSectionTransform(AppTransform):
         Add an option to Select widgets to indicate select all on this level.""",
     )
 
+    slice_cache_size = param.Integer(
+        default=None,
+        bounds=(1, None),
+        doc="Number of cross-section positions to keep in a per-transform LRU cache. "
+            "Positions are cleared when the index changes. Cross-sections taken from cached "
+            "positions are not stored in the shared cache. If None, positions are not cached",
+    )
+
+    coalesce = param.Boolean(
+        default=True,
+        doc="Coalesce the cascade of selector changes into a single `updated` event, "
+            "which is only sent when the key changed",
+    )
+
     def __init__(self, **params):
         super().__init__(**params)
         self.index = (
             None  # index is the df index which determines the selector's options
         )
+        self._cascade_depth = 0  # number of nested selector changes being handled
+        self._lookup = None  # lookup table of the index for selector options and xs
+        self._slices = None  # cache of cross-section positions
         self.update()
 
-    @param.depends("source.updated", watch=True)
+    @property
+    def source_hash(self):
+        column_hashes = self.source.column_hashes
+        if column_hashes is None:
+            return self.source.hash
+        # Selector options are derived from all column labels
+        return tuple(column_hashes), super().source_hash
+
+    def columns_read(self, columns: list) -> Optional[list]:
+        if self.axis == 0 or not self.key:
+            return None
+        if not all(isinstance(level, int) for level in self.level):
+            return None
+
+        def matches(column):
+            labels = column if isinstance(column, tuple) else (column,)
+            return all(
+                isinstance(key, slice) or (level < len(labels) and labels[level] == key)
+                for key, level in zip(self.key, self.level)
+            )
+
+        return [column for column in columns if matches(column)]
+
+    def input_columns(self, columns: Optional[list]) -> Optional[list]:
+        # Cross-sections of rows keep all columns
+        return columns if self.axis == 0 else None
+
     def update(self):
 
         if self.update_hash():
             # todo remove watchers when new transforms are created?
             old_index = self.index
-            df = self.source.get()
+            df = to_pandas(self.source.get())
 
             if df is None:
                 return
             self.index = df.columns if self.axis else df.index
+            if self._lookup is None or not self.index.equals(old_index):
+                self._lookup = IndexLookup(self.index)
+                if self.slice_cache_size is not None:
+                    self._slices = MemoryCache(max_items=self.slice_cache_size)
             self._names = self.names or self.index.names
 
-            if old_index is not None and self.index.nlevels == old_index.nlevels:
-                # no redraw needed, only update selectors options
-                options = list(self.index.unique(level=0))
-                self.selectors[0].options = options
-                self.selectors[0].param.trigger("value")
-                for name, selector in zip(self._names, self.selectors):
-                    selector.name = name  # todo requires testing if the names are really updated or not (they arent)
-                    selector.label = name  # todo requires testing if the names are really updated or not
-                    self.redrawn = True
-            else:
-                self.redraw()
-
+            self._cascade_depth += 1
+            try:
+                if old_index is not None and self.index.nlevels == old_index.nlevels:
+                    # no redraw needed, only update selectors options
+                    options = self._lookup.options([])
+                    self.selectors[0].options = options
+                    self.selectors[0].param.trigger("value")
+                    for name, selector in zip(self._names, self.selectors):
+                        selector.name = name  # todo requires testing if the names are really updated or not (they arent)
+                        selector.label = name  # todo requires testing if the names are really updated or not
+                        self.redrawn = True
+                else:
+                    self.redraw()
+            finally:
+                self._cascade_depth -= 1
+
+            if self.coalesce:
+                self._set_key()
+                self.update_hash()
             self.updated = True
 
     def redraw(self):
@@ -276,7 +846,7 @@ class CrossSectionTransform(AppTransform):
         for selector in self.selectors:
             selector.param.watch(self._selector_changed, ["value"], onlychanged=True)
 
-        options = list(self.index.get_level_values(0).unique())
+        options = self._lookup.options([])
         if self.empty_select:  # todo use Nonetype? -> allow_none kwarg for Select?
             options = ["None"] + options
         self.selectors[0].options = options
@@ -284,18 +854,102 @@ class CrossSectionTransform(AppTransform):
 
         self.redrawn = True
 
-    def transform(self):
-        df = self.source.get()
+    def apply(self, df):
         if df is None:
             return df
 
-        kwargs = self.pd_kwargs
-        # drop level bugged? https://github.com/pandas-dev/pandas/issues/6507
-        df = df.xs(**kwargs)
+        positions = self._xs_positions(df.columns if self.axis else df.index)
+        if positions is None:
+            kwargs = self.pd_kwargs
+            # drop level bugged? https://github.com/pandas-dev/pandas/issues/6507
+            return df.xs(**kwargs)
+
+        df = df.iloc[:, positions] if self.axis else df.iloc[positions]
+        if self.drop_level:
+            df = df.droplevel(self.level, axis=self.axis)
         return df
 
+    @property
+    def cached(self) -> bool:
+        # Cross-sections from cached positions are cheap to take from the source data, such
+        # that storing them in the shared cache would only duplicate the source data
+        if self._slices is not None and self._lookup_applies(self.index):
+            return False
+        return super().cached
+
+    def get(self):
+        if not self.lazy and not self.cached:
+            return self.transform()
+        return super().get()
+
+    async def aget(self, executor: Optional[Executor] = None) -> Any:
+        if not self.lazy and not self.cached:
+            return await Transform.aget(self, executor)
+        return await super().aget(executor)
+
+    def _lookup_applies(self, index: Optional[pd.Index]) -> bool:
+        """Whether the cross-section of `index` can be taken from the lookup table"""
+        if self._lookup is None or not isinstance(index, pd.MultiIndex):
+            return False
+        # Only keys on the first levels which leave at least one level
+        if self.level != list(range(len(self.key))) or len(self.key) >= index.nlevels:
+            return False
+        return not any(isinstance(value, slice) for value in self.key)
+
+    def _xs_positions(self, index: pd.Index) -> Optional[np.ndarray]:
+        """Positions of the cross-section in `index` from the lookup table.
+
+        Returns:
+            Array of integer positions, or `None` if the lookup table does not apply and
+            `xs` should be used instead.
+
+        """
+        if not self._lookup_applies(index):
+            return None
+        if not (index is self.index or index.equals(self.index)):
+            return None
+
+        slice_key = (self.axis, tuple(self.key))
+        if self._slices is not None and slice_key in self._slices:
+            positions = self._slices[slice_key]
+        else:
+            positions = self._lookup.positions(self.key)
+            if self._slices is not None:
+                self._slices[slice_key] = positions
+
+        return positions if len(positions) else None
+
     def _selector_changed(self, *events):
-        # this sends multiple updated events as it triggers changes in other selectors
+        # this triggers changes in other selectors, which are handled by nested calls
+        self._cascade_depth += 1
+        try:
+            if not self._update_selectors(*events):
+                return
+        finally:
+            self._cascade_depth -= 1
+
+        # With coalesce, only the outermost call sets the key and sends `updated`
+        if self.coalesce:
+            if self._cascade_depth == 0:
+                self._set_key()
+                if self.update_hash():
+                    self.updated = True
+        else:
+            self._set_key()
+            self.updated = True
+
+    def _set_key(self):
+        all_values = [selector.value for selector in self.selectors]
+        self.key = [value if value != "None" else slice(None) for value in all_values]
+        self.level = list(range(len(all_values)))
+
+    def _update_selectors(self, *events) -> bool:
+        """Update the options of the selectors following the changed selectors.
+
+        Returns:
+            `False` if the changed selector no longer exists, `True` otherwise.
+
+        """
         for event in events:
             try:
                 current_index = self.selectors.index(
@@ -304,7 +958,7 @@ class CrossSectionTransform(AppTransform):
             except ValueError:
                 # I suspect this happens when there is redraw and the selector which triggered the change is no longer
                 # in existence. So we can probaly ignore the event
-                return
+                return False
 
             try:  # try/except when we are at the last selector
                 next_selector = self.selectors[current_index + 1]
@@ -314,11 +968,7 @@ class CrossSectionTransform(AppTransform):
                     selector.value for selector in self.selectors[: current_index + 1]
                 ]
                 key = [value if value != "None" else slice(None) for value in values]
-                level = list(range(current_index + 1))
-                bools, current_columns = self.index.get_loc_level(key=key, level=level)
-                options = list(
-                    current_columns.get_level_values(0).unique()
-                )  # current_columns.unique(level=0)
+                options = self._lookup.options(key)
                 if self.empty_select:
                     options = ["None"] + options
                 next_selector.options = options
@@ -329,15 +979,7 @@ class CrossSectionTransform(AppTransform):
             except IndexError:
                 pass
 
-        # set the df
-        all_values = [selector.value for selector in self.selectors]
-        self.key = [value if value != "None" else slice(None) for value in all_values]
-        self.level = list(range(len(all_values)))
-
-        # TODO:
-        # if self.update_hash() ?
-
-        self.updated = True
+        return True
 
     @property
     def pd_kwargs(self):
@@ -371,8 +1013,14 @@ class ApplyCmapOptTransform(AppTransform):
         super().__init__(**params)
         self.widgets = {"opts": pn.pane.panel(self.param.opts)}
 
+    @property
+    def cached(self) -> bool:
+        return False
+
     def get(self):
-        df = self.source.get()  # todo refactor df to data as it can also be a series?
+        return self.apply(to_pandas(self.source.get()))
+
+    def apply(self, df):  # todo refactor df to data as it can also be a series?
         if df is None:
             return None
 
@@ -392,7 +1040,6 @@ class ApplyCmapOptTransform(AppTransform):
     def _opts_changed(self):
         self.updated = True  # opts options are the same but selection changed, signal
 
-    @param.depends("source.updated", watch=True)
     def update(self):
         pd_series = self.source.get()
         # todo just show all, later deal with setting the correct one? (infer from previous transform setting)
@@ -420,25 +1067,57 @@ class ApplyCmapOptTransform(AppTransform):
 
 
 class GenericTransform(AppTransform):
+    """Applies a single dataframe method.
+
+    With the 'polars' backend, `pd_function` and the additional kwargs refer to the method of
+    the polars LazyFrame (or DataFrame), and the result is a polars DataFrame. Results of lazy
+    transforms stay uncollected such that fused transforms run as a single polars query.
+
+    """
+
     _type = "generic"
 
     pd_function = param.String()
 
     kwargs = param.Dict(doc="dict of additional kwargs")
 
+    backend = param.Selector(
+        default="pandas",
+        objects=BACKENDS,
+        doc="Dataframe library used to apply the transform. Input data is converted to pandas "
+            "for the 'pandas' backend",
+    )
+
     def __init__(self, **params):
         self.kwargs = {k: v for k, v in params.items() if k not in self.param}
         super().__init__(**{k: v for k, v in params.items() if k in self.param})
 
-    def transform(self):
-        df = self.source.get()
+    def apply(self, df):
         if df is None:
             return df
+        if self.backend == "polars":
+            return apply_polars(df, self.pl_steps(df), lazy=self.lazy)
+
         func = getattr(df, self.pd_function)
         df = func(**self.pd_kwargs)
 
         return df
 
+    def pl_steps(self, df) -> list[tuple[str, list, dict]]:
+        """polars (method, args, kwargs) steps applied for the 'polars' backend.
+
+        Args:
+            df: Input data, a pandas or polars dataframe. Steps are applied to the data
+                converted by `to_polars`.
+
+        """
+        return [(self.pd_function, [], self.pd_kwargs)]
+
+    @property
+    def incremental(self) -> bool:
+        kwargs = self.pd_kwargs or {}
+        return self.pd_function in ROW_WISE_FUNCTIONS and kwargs.get("axis", 0) in [0, "index"]
+
     @property
     def pd_kwargs(self):
         """kwargs to pass to pandas function"""
@@ -450,6 +1129,10 @@ class DropLevelTransform(GenericTransform):
 
     pd_function = "droplevel"
 
+    backend = param.Selector(
+        default="pandas", objects=["pandas"], doc="Only the 'pandas' backend is supported"
+    )
+
 
 class RenameTransform(GenericTransform):
     _type = "rename"
@@ -460,10 +1143,12 @@ class RenameTransform(GenericTransform):
         self.kwargs = {k: v for k, v in params.items() if k not in self.param}
         super().__init__(**params)
 
-    def transform(self):
-        df = self.source.get()
+    def apply(self, df):
         if df is None:
             return None
+        if self.backend == "polars":
+            return super().apply(df)
+
         kwargs = self.pd_kwargs.copy()
         columns = kwargs.pop("columns", None)
         if isinstance(columns, list):
@@ -474,12 +1159,39 @@ class RenameTransform(GenericTransform):
 
         return df
 
+    def input_columns(self, columns: Optional[list]) -> Optional[list]:
+        mapping = (self.pd_kwargs or {}).get("columns")
+        # Renaming by list depends on the order of the source columns
+        if columns is None or not isinstance(mapping, dict):
+            return None
+
+        inverse = {new: old for old, new in mapping.items()}
+        return [inverse.get(column, column) for column in columns]
+
+    def pl_steps(self, df) -> list[tuple[str, list, dict]]:
+        columns = self.pd_kwargs.get("columns")
+        if isinstance(columns, list):
+            if isinstance(df, pd.DataFrame):
+                # Only the names of the data columns, not of the index columns which are
+                # included by to_polars
+                names = to_polars(df.iloc[:0]).collect_schema().names()
+                names = names[len(names) - len(df.columns):]
+            else:
+                names = df.collect_schema().names()
+            columns = {old: new for old, new in zip(names, columns)}
+
+        return [("rename", [columns], {})]
+
 
 class ResetIndexTransform(GenericTransform):
     _type = "reset_index"
 
     pd_function = "reset_index"
 
+    backend = param.Selector(
+        default="pandas", objects=["pandas"], doc="Only the 'pandas' backend is supported"
+    )
+
 
 class RescaleTransform(GenericTransform):
     """Rescale a single column"""
@@ -492,15 +1204,47 @@ class RescaleTransform(GenericTransform):
 
     scale_factor = param.Number(1.0)
 
-    def transform(self):  # todo perhaps some kind of decorator that returns nonealwasy?
-        df = self.source.get()
+    @property
+    def column_hashes(self):
+        # All columns are read as the output includes them, but only the rescaled
+        # columns change
+        column_hashes = self.source.column_hashes
+        if column_hashes is None:
+            return None
+
+        return {
+            column: h
+            if column not in self.columns
+            else str(hash_object((h, self.scale_factor), method=self._hash_method))
+            for column, h in column_hashes.items()
+        }
+
+    def apply(self, df):  # todo perhaps some kind of decorator that returns nonealwasy?
         if df is None:
             return None
+        if self.backend == "polars":
+            return super().apply(df)
+
         for column in self.columns:
             df = df.assign(**{column: lambda x: x[column] * self.scale_factor})
 
         return df
 
+    @property
+    def incremental(self) -> bool:
+        return True
+
+    def input_columns(self, columns: Optional[list]) -> Optional[list]:
+        # Rescaled columns are read by `apply`, even if they are not used downstream
+        if columns is None:
+            return None
+        return columns + [column for column in self.columns if column not in columns]
+
+    def pl_steps(self, df) -> list[tuple[str, list, dict]]:
+        expressions = [pl.col(column) * self.scale_factor for column in self.columns]
+
+        return [("with_columns", expressions, {})]
+
 
 class PivotTransform(GenericTransform):
     _type = "pivot"
@@ -519,6 +1263,39 @@ class PivotTransform(GenericTransform):
         # todo get_params func which finds the correct params here
         return dict(index=self.index, columns=self.columns, values=self.values)
 
+    def pl_steps(self, df) -> list[tuple[str, list, dict]]:
+        return [("pivot", [], dict(on=self.columns, index=self.index, values=self.values))]
+
+    def input_columns(self, columns: Optional[list]) -> Optional[list]:
+        # Without values, all remaining columns are used
+        if self.values is None:
+            return None
+
+        read = []
+        for arg in [self.index, self.columns, self.values]:
+            for column in [] if arg is None else [arg] if isinstance(arg, str) else arg:
+                if column not in read:
+                    read.append(column)
+
+        return read
+
+    def columns_read(self, columns: list) -> Optional[list]:
+        # Without values, all remaining columns are used
+        if self.values is None:
+            return None
+
+        read = []
+        for arg in [self.index, self.columns, self.values]:
+            if arg is None:
+                continue
+            for column in [arg] if isinstance(arg, str) else arg:
+                if column not in columns:
+                    return None
+                if column not in read:
+                    read.append(column)
+
+        return read
+
 
 class StackTransform(GenericTransform):
     _type = "stack"
@@ -532,6 +1309,10 @@ class StackTransform(GenericTransform):
 
     dropna = param.Boolean(True)
 
+    backend = param.Selector(
+        default="pandas", objects=["pandas"], doc="Only the 'pandas' backend is supported"
+    )
+
     @property
     def pd_kwargs(self):
         """kwargs to pass to pandas function"""
@@ -570,8 +1351,7 @@ class SampleTransform(AppTransform):
 
     axis = param.Number(0, inclusive_bounds=(0, 1))
 
-    def transform(self):
-        df = self.source.get()
+    def apply(self, df):
         if df is None:
             return None
 
@@ -600,22 +1380,50 @@ class SampleTransform(AppTransform):
 
         return df
 
+    @property
+    def incremental(self) -> bool:
+        # The sampling step only remains the same for a fixed fraction
+        return not self.random and self.axis == 0 and self.n is None and self.frac is not None
+
+    def input_columns(self, columns: Optional[list]) -> Optional[list]:
+        return columns if self.axis == 0 else None
+
+    def apply_appended(self, previous: pd.DataFrame, rows: pd.DataFrame, start: int):
+        step = max(int(1 / self.frac), 1)
+        offset = -start % step
+
+        return pd.concat([previous, rows.iloc[offset::step]])
+
 
 class PipeTransform(AppTransform):
     """applies a list of pandas functions
 
     (not exactly the same as df.pipe)
 
+    With the 'polars' backend, the functions are polars LazyFrame (or DataFrame) methods.
+
     """
 
     _type = "pipe"
 
     pipe = param.List()  # list of dicts
 
-    def transform(self):
-        df = self.source.get()
+    backend = param.Selector(
+        default="pandas",
+        objects=BACKENDS,
+        doc="Dataframe library used to apply the transform. Input data is converted to pandas "
+            "for the 'pandas' backend",
+    )
+
+    def apply(self, df):
         if df is None:
             return None
+        if self.backend == "polars":
+            steps = [
+                (d["function"], d.get("args", []), d.get("kwargs", {})) for d in self.pipe
+            ]
+            return apply_polars(df, steps, lazy=self.lazy)
+
         for d in self.pipe:
             func = getattr(df, d["function"])
             args = d.get("args", [])
@@ -624,3 +1432,11 @@ class PipeTransform(AppTransform):
             df = func(*args, **kwargs)
 
         return df
+
+    @property
+    def incremental(self) -> bool:
+        return all(
+            d["function"] in ROW_WISE_FUNCTIONS
+            and d.get("kwargs", {}).get("axis", 0) in [0, "index"]
+            for d in self.pipe
+        )
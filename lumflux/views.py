@@ -6,20 +6,21 @@ import re
 import time
 from functools import partial
 from itertools import groupby, count
-from typing import Union, Optional
+from typing import Any, Union, Optional
 
 import holoviews as hv
 import numpy as np
 import pandas as pd
 import panel as pn
 import param
-from holoviews.streams import Pipe, Params
+from holoviews.streams import Buffer, Pipe, Params
 from panel.pane.base import PaneBase
 
 from lumflux.sources import Source
 from lumflux.transforms import Transform
 from lumflux.pane import LoggingMarkdown
 from lumflux.base import HasWidgets
+from lumflux.support import to_pandas
 
 from hvplot import hvPlotTabular
 
@@ -51,11 +52,28 @@ class View(HasWidgets):
         super().__init__(**params)
         # todo allow for kwargs to be passed to DynamicMap's func
 
-        for dep in self.dependencies:
-            dep.param.watch(self.update, ["updated"])
+        self._scheduler = None
+        for obj in self.upstream:
+            obj.param.watch(self._upstream_updated, ["updated"])
 
         self._panel = None
 
+    @property
+    def upstream(self) -> list:
+        """Objects whose `updated` event triggers an update of the view"""
+        source = [] if self.source is None else [self.source]
+        return source + self.dependencies
+
+    def _upstream_updated(self, *events):
+        # With a scheduler attached, updates are called by the scheduler instead
+        if self._scheduler is None:
+            self.update()
+
+    @property
+    def required_columns(self) -> Optional[list]:
+        """Columns of the source data used by the view, `None` if all columns can be used"""
+        return None
+
     def get_data(self) -> pd.DataFrame:  # refactor get?
         """
         Queries the Source
@@ -66,7 +84,21 @@ class View(HasWidgets):
 
         """
 
-        df = self.source.get()
+        # Conversion of polars data happens only here, at the view boundary
+        df = to_pandas(self.source.get())
+        if df is None:
+            return self.empty_df
+        else:
+            return df
+
+    async def aget_data(self) -> pd.DataFrame:
+        """Awaitable version of `get_data`, transforms are computed on an executor"""
+        if isinstance(self.source, Transform):
+            df = await self.source.aget()
+        else:
+            df = self.source.get()
+
+        df = to_pandas(df)
         if df is None:
             return self.empty_df
         else:
@@ -128,7 +160,6 @@ class DataFrameView(View):
         return True
 
 
-    @param.depends("source.updated", watch=True)
     def update(self, *events) -> None:
         self._update_panel()
 
@@ -147,6 +178,28 @@ class hvView(View):
         The Source to query for the data.""",
     )
 
+    asynchronous = param.Boolean(
+        default=False,
+        precedence=-1,
+        doc="Compute data on an executor and send it to the stream when ready, without "
+            "blocking the event loop. Newer updates supersede pending ones.",
+    )
+
+    streaming = param.Boolean(
+        default=False,
+        precedence=-1,
+        doc="Only send new rows to a `Buffer` stream. Requires data with an increasing index, "
+            "such as from a `StreamingTableSource`; rows are new if their index is larger "
+            "than that of the rows sent before.",
+    )
+
+    buffer_length = param.Integer(
+        default=10000,
+        bounds=(1, None),
+        precedence=-1,
+        doc="Number of rows kept by the `Buffer` stream of streaming views",
+    )
+
     _type = None
 
     _stream = param.ClassSelector(class_=Pipe)
@@ -154,23 +207,68 @@ class hvView(View):
     def __init__(self, **params):
         super().__init__(**params)
         data = self.get_data()
-        self._stream = Pipe(data=data)
+        if self.streaming:
+            self._stream = Buffer(data=data, length=self.buffer_length)
+        else:
+            self._stream = Pipe(data=data)
+        self._last_index = self._index_end(data)
         self.dmap = None
+        self._update_count = 0
         #self._get_params()
 
-    @param.depends("source.updated", watch=True)
     def update(self, *events) -> None:
         """Triggers an update of the view.
 
-        The source is queried for new data and this is sent to the `_stream` object.
+        The source is queried for new data and this is sent to the `_stream` object. If
+        `asynchronous` is set, the data is sent when ready.
 
         """
-        data = self.get_data()
+        if self.asynchronous:
+            self._update_count += 1
+            pn.state.execute(partial(self._aupdate, self._update_count))
+        else:
+            self._send(self.get_data())
+
+    async def _aupdate(self, update_count: int) -> None:
+        # Updates are skipped or discarded when a newer update has been requested
+        if update_count != self._update_count:
+            return
+        data = await self.aget_data()
+        if update_count == self._update_count:
+            self._send(data)
+
+    def _send(self, data: pd.DataFrame) -> None:
+        """Sends new data to the `_stream` object"""
         if self.dmap is not None:
             print("resetting")
             self.dmap.reset()
         if data is not None:
+            self._send_stream(data)
+
+    def _send_stream(self, data: pd.DataFrame) -> None:
+        """Sends data to the stream, only the new rows for streaming views"""
+        if not self.streaming:
             self._stream.send(data)
+            return
+
+        end = self._index_end(data)
+        last = self._last_index
+        if last is not None and end is not None and data.index[0] <= last <= end:
+            # The data continues the rows sent before
+            start = data.index.searchsorted(self._last_index, side="right")
+            if start < len(data):
+                self._stream.send(data.iloc[start:])
+        else:
+            self._stream.clear()
+            self._stream.send(data)
+        self._last_index = end
+
+    @staticmethod
+    def _index_end(data: Optional[pd.DataFrame]) -> Any:
+        """Last index value of data with an increasing index, otherwise `None`"""
+        if data is None or len(data) == 0 or not data.index.is_monotonic_increasing:
+            return None
+        return data.index[-1]
 
     def get_panel(self):
         kwargs = self._get_params()
@@ -258,21 +356,27 @@ class hvXYView(hvView):
         precedence=-1
     )
 
-    @param.depends("source.updated", watch=True)
-    def update(self, *events) -> None:
-        """Triggers an update of the view.
+    @property
+    def required_columns(self) -> Optional[list]:
+        # Columns can only be determined from explicit lists of allowed columns
+        if not (isinstance(self.x_objects, list) and isinstance(self.y_objects, list)):
+            return None
 
-        The source is queried for new data and this is sent to the `_stream` object. The
-        selector options for x and y are updated.
+        columns = [self.x, self.y, *self.x_objects, *self.y_objects]
+        color = self.opts_dict.get("color")
+        if isinstance(color, str):
+            columns.append(color)
 
-        """
-        data = self.get_data()
+        return list(dict.fromkeys(c for c in columns if c is not None))
+
+    def _send(self, data: pd.DataFrame) -> None:
+        """Sends new data to the `_stream` object and updates x and y selector options"""
         if data is not None:
             self.param['x'].objects = self.resolve_columns(data, self.x_objects)
             self.param['y'].objects = self.resolve_columns(data, self.y_objects)
 
             # todo check for case whe updated dataframe longer has current value of x in columns
-            self._stream.send(data)
+            self._send_stream(data)
 
     @staticmethod
     def resolve_columns(data: pd.DataFrame, spec: Union[list, re.Pattern, None]) -> list[str]:
@@ -426,6 +530,10 @@ class hvRectanglesAppView(hvView):
     def kdims(self):
         return [self.x0, self.y0, self.x1, self.y1]
 
+    @property
+    def required_columns(self) -> Optional[list]:
+        return self.kdims + self.vdims
+
     @property
     def empty_df(self):
         columns = self.kdims + self.vdims
@@ -495,6 +603,10 @@ class hvErrorBarsAppView(hvView):
     def kdims(self):
         return [self.pos]
 
+    @property
+    def required_columns(self) -> Optional[list]:
+        return self.kdims + self.vdims
+
     @property
     def empty_df(self):
         columns = self.kdims + self.vdims
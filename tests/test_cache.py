@@ -0,0 +1,135 @@
+"""Tests for `lumflux.cache`."""
+
+import gc
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from lumflux.cache import HybridArrowCache, MemoryCache, sizeof
+
+
+def array(n_bytes):
+    return np.zeros(n_bytes // 8)
+
+
+def test_memory_cache_lru_max_items():
+    cache = MemoryCache(max_items=3)
+    for key in "abc":
+        cache[key] = array(80)
+
+    # Reading an item makes it the most recently used
+    cache["a"]
+    cache["d"] = array(80)
+    assert "b" not in cache
+    assert all(key in cache for key in "acd")
+
+    cache["e"] = array(80)
+    assert "c" not in cache
+    assert list(cache._cache) == ["a", "d", "e"]
+
+
+def test_memory_cache_lru_max_bytes():
+    cache = MemoryCache(max_bytes=2400)
+    cache["a"] = array(800)
+    cache["b"] = array(800)
+    cache["c"] = array(800)
+    assert cache._nbytes == 2400
+
+    cache["b"]
+    cache["d"] = array(1600)
+    assert list(cache._cache) == ["b", "d"]
+    assert cache._nbytes == 2400
+    assert cache._sizes == {"b": 800, "d": 1600}
+
+
+def test_memory_cache_bytes_accounting():
+    cache = MemoryCache(max_bytes=4000)
+    cache["a"] = array(800)
+    cache["a"] = array(1600)  # replacing an item replaces its size
+    assert cache._nbytes == 1600
+
+    # Items larger than max_bytes are not cached and evict nothing
+    cache["b"] = array(8000)
+    assert "b" not in cache and "a" in cache
+    assert cache._nbytes == 1600
+
+    cache["c"] = pd.DataFrame({"x": np.zeros(100)}, index=pd.RangeIndex(100))
+    assert cache._nbytes == 1600 + sizeof(cache["c"])
+    assert cache._nbytes == sum(cache._sizes.values())
+
+
+def test_memory_cache_gds_eviction():
+    cache = MemoryCache(max_bytes=3000, policy="gds")
+    cache.set("cheap", array(1000), cost=0.001)
+    cache.set("expensive", array(1000), cost=1.0)
+    cache.set("large", array(1000), cost=0.5)
+
+    # Lowest cost per byte is evicted first
+    cache.set("new", array(1000), cost=0.1)
+    assert "cheap" not in cache
+    assert all(key in cache for key in ["expensive", "large", "new"])
+
+    cache.set("newer", array(1000), cost=0.2)
+    assert "new" not in cache
+    assert all(key in cache for key in ["expensive", "large", "newer"])
+
+
+def test_memory_cache_gds_cost_per_byte():
+    cache = MemoryCache(max_bytes=3500, policy="gds")
+    cache.set("small", array(800), cost=0.1)
+    cache.set("big", array(2400), cost=0.2)
+
+    # The big item is more expensive, but cheaper per byte
+    cache.set("new", array(800), cost=0.1)
+    assert "big" not in cache
+    assert "small" in cache and "new" in cache
+
+
+def test_memory_cache_gds_aging():
+    cache = MemoryCache(max_items=2, policy="gds")
+    cache.set("a", array(800), cost=1.0)
+    cache.set("b", array(800), cost=0.5)
+
+    # Evicting items inflates the priority of items set later, such that items which
+    # were expensive long ago are eventually evicted
+    for i in range(5):
+        cache.set(f"c{i}", array(800), cost=0.5)
+    assert "a" not in cache
+    assert len(cache._cache) == 2
+
+
+def test_hybrid_arrow_cache_temporary_dir_removed():
+    cache = HybridArrowCache(bytes_threshold=0)
+    cache["a"] = pd.DataFrame({"x": np.arange(10.0)})
+    cache_dir = cache.cache_dir
+    assert os.listdir(cache_dir)
+    pd.testing.assert_frame_equal(cache["a"], pd.DataFrame({"x": np.arange(10.0)}))
+
+    del cache
+    gc.collect()
+    assert not os.path.exists(cache_dir)
+
+
+def test_hybrid_arrow_cache_shared_dir(tmp_path):
+    caches = [
+        HybridArrowCache(cache_dir=str(tmp_path), persistent=True, bytes_threshold=0)
+        for _ in range(4)
+    ]
+    df = pd.DataFrame({"x": np.arange(10000.0)})
+
+    def write(cache):
+        for _ in range(5):
+            cache["a"] = df
+
+    threads = [threading.Thread(target=write, args=(cache,)) for cache in caches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Caches which share a directory do not remove it, and leave no temporary files
+    assert [p.suffix for p in tmp_path.iterdir()] == [".parquet"]
+    reader = HybridArrowCache(cache_dir=str(tmp_path), persistent=True)
+    pd.testing.assert_frame_equal(reader["a"], df)
@@ -0,0 +1,145 @@
+"""Tests for `lumflux.scheduler`."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from lumflux.cache import MemoryCache
+from lumflux.scheduler import Scheduler
+from lumflux.sources import TableSource
+from lumflux.transforms import GetItemTransform, RescaleTransform, SelectTransform
+
+
+def make_source():
+    source = TableSource()
+    source.set(pd.DataFrame({"a": [1.0, 2.0], "b": [3.0, 4.0]}), name="t")
+    return source
+
+
+class CountingRescaleTransform(RescaleTransform):
+    """RescaleTransform which counts calls to `apply`, which takes some time"""
+
+    _type = "counting_rescale"
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self.n_apply = 0
+        self._lock = threading.Lock()
+
+    def apply(self, df):
+        with self._lock:
+            self.n_apply += 1
+        time.sleep(0.05)
+        return super().apply(df)
+
+
+class CountingView(object):
+    """Minimal view which counts its updates"""
+
+    def __init__(self, source, dependencies=()):
+        self.source = source
+        self.upstream = [source, *dependencies]
+        self.n_update = 0
+        self.data = None
+
+    def update(self):
+        self.n_update += 1
+        self.data = self.source.get()
+
+
+def count_updates(transform):
+    """Count calls to `update` of a transform"""
+    transform.n_update = 0
+    update = transform.update
+
+    def counting_update(*args, **kwargs):
+        transform.n_update += 1
+        return update(*args, **kwargs)
+
+    transform.update = counting_update
+    return transform
+
+
+def diamond():
+    source = make_source()
+    item = GetItemTransform(source=source, item="t")
+    left = RescaleTransform(source=item, columns=["a"], scale_factor=2.0)
+    right = RescaleTransform(source=item, columns=["b"], scale_factor=3.0)
+    select = SelectTransform(sources={"left": left, "right": right})
+    transforms = {"item": item, "left": left, "right": right, "select": select}
+    for transform in transforms.values():
+        count_updates(transform)
+
+    views = {
+        "select": CountingView(select),
+        "left": CountingView(left, dependencies=[right]),
+    }
+    scheduler = Scheduler(transforms=transforms, views=views)
+    return source, transforms, views, scheduler
+
+
+def test_diamond_updates_each_node_once():
+    source, transforms, views, scheduler = diamond()
+
+    source.set(pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": [4.0, 5.0, 6.0]}), name="t")
+    assert {name: t.n_update for name, t in transforms.items()} == {
+        "item": 1, "left": 1, "right": 1, "select": 1,
+    }
+    assert {name: view.n_update for name, view in views.items()} == {"select": 1, "left": 1}
+    assert views["select"].data["a"].tolist() == [2.0, 4.0, 6.0]
+    assert views["left"].data["b"].tolist() == [4.0, 5.0, 6.0]
+
+
+def test_updates_only_downstream_nodes():
+    source, transforms, views, scheduler = diamond()
+
+    transforms["right"].scale_factor = 10.0
+    transforms["right"].updated = True
+    assert transforms["left"].n_update == 0
+    assert transforms["select"].n_update == 1
+    # The hash of select only depends on the selected source, such that it does not fire
+    assert {name: view.n_update for name, view in views.items()} == {"select": 0, "left": 1}
+
+
+def test_updated_during_pass_is_handled():
+    source, transforms, views, scheduler = diamond()
+
+    # An upstream node fires `updated` again while its downstream nodes are updated
+    update = transforms["select"].update
+    fired = []
+
+    def firing_update(*args, **kwargs):
+        if not fired:
+            fired.append(True)
+            transforms["left"].updated = True
+        return update(*args, **kwargs)
+
+    transforms["select"].update = firing_update
+    source.set(pd.DataFrame({"a": [1.0], "b": [2.0]}), name="t")
+    # Nodes downstream of left are updated again in a second pass
+    assert transforms["left"].n_update == 1
+    assert transforms["select"].n_update == 2
+    assert views["left"].n_update == 2
+    assert views["select"].n_update == 1
+    assert not scheduler._running and not scheduler._dirty and not scheduler._pending
+
+
+def test_evaluate_through_lazy_transforms():
+    cache = MemoryCache()
+    item = GetItemTransform(source=make_source(), item="t")
+    a = CountingRescaleTransform(source=item, columns=["a"], scale_factor=2.0, _cache=cache)
+    b = CountingRescaleTransform(
+        source=a, columns=["a"], scale_factor=3.0, lazy=True, _cache=cache
+    )
+    c = CountingRescaleTransform(source=b, columns=["b"], scale_factor=4.0, _cache=cache)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        Scheduler.evaluate([item, a, b, c], executor)
+
+    # c is evaluated after a, such that a is computed once
+    assert a.n_apply == 1
+    assert c.n_apply == 1
+    assert c.hash in cache and a.hash in cache and b.hash not in cache
+    assert c.get()["a"].tolist() == [6.0, 12.0]
@@ -0,0 +1,107 @@
+"""Tests for `lumflux.sources`."""
+
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lumflux.sources import FileTableSource, StreamingTableSource, TableSource
+
+
+@pytest.fixture
+def file_source(tmp_path):
+    paths = {}
+    for i in range(4):
+        path = tmp_path / f"t{i}.parquet"
+        pd.DataFrame({"a": np.arange(1000.0) + i, "b": np.arange(1000)}).to_parquet(path)
+        paths[f"t{i}"] = str(path)
+    return FileTableSource(paths=paths, max_bytes=20000)
+
+
+def test_file_table_source_lazy_items(file_source):
+    assert len(file_source._loaded) == 0
+    values = file_source.values()
+    items = file_source.items()
+    assert len(file_source._loaded) == 0
+
+    for (name, df), value in zip(items, values):
+        assert df["a"].iloc[0] == int(name[1:])
+        pd.testing.assert_frame_equal(df, value)
+        # Tables are unloaded as the next ones are loaded
+        assert len(file_source._loaded) <= 2
+
+
+def test_file_table_source_concurrent_get(file_source):
+    results = []
+    errors = []
+
+    def get(name):
+        try:
+            for _ in range(20):
+                results.append((name, file_source.get(name, columns=["a"])))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=get, args=(f"t{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(results) == 80
+    for name, df in results:
+        assert df is not None
+        assert df["a"].iloc[0] == int(name[1:])
+    assert sum(file_source._loaded.values()) <= 20000 or len(file_source._loaded) == 1
+
+
+def count_updated(source):
+    events = []
+    source.param.watch(lambda event: events.append(event), ["updated"])
+    return events
+
+
+def test_batch_fires_one_updated():
+    source = TableSource()
+    source.set(pd.DataFrame({"a": [1.0, 2.0]}), name="t")
+    events = count_updated(source)
+
+    with source.batch():
+        for i in range(5):
+            source.append(pd.DataFrame({"a": [float(i)]}, index=[2 + i]), name="t")
+        with source.batch():  # nested batches fire on exit of the outermost batch
+            source.set(pd.DataFrame({"b": [1.0]}), name="u")
+        assert len(events) == 0
+
+    assert len(events) == 1
+    # Appends within a batch are merged into a single delta
+    assert source.deltas["t"][1:] == (2, 7)
+    assert len(source.get("t")) == 7
+
+    # Batches without updates do not fire
+    with source.batch():
+        pass
+    assert len(events) == 1
+
+
+def test_set_many_fires_one_updated():
+    source = TableSource()
+    events = count_updated(source)
+    source.set_many({"t": pd.DataFrame({"a": [1.0]}), "u": pd.DataFrame({"a": [2.0]})})
+
+    assert len(events) == 1
+    assert sorted(source.keys()) == ["t", "u"]
+
+
+def test_streaming_batch_fires_one_updated():
+    source = StreamingTableSource(capacity=10)
+    events = count_updated(source)
+
+    with source.batch():
+        source.set({"x": np.arange(3)}, name="t")
+        source.append({"x": np.arange(3, 6)}, name="t")
+
+    assert len(events) == 1
+    assert source.get("t")["x"].tolist() == list(range(6))
@@ -0,0 +1,152 @@
+"""Tests for `lumflux.support`."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lumflux.support import IndexLookup, RingBuffer, hash_object
+
+
+@pytest.mark.parametrize("method", ["md5", "blake2"])
+def test_hash_object_series(method):
+    s1 = pd.Series(np.arange(10000.0), name="x")
+    s2 = s1.copy()
+    s2[5000] = -1.0
+
+    assert hash_object(s1, method) == hash_object(s1.copy(), method)
+    assert hash_object(s1, method) != hash_object(s2, method)
+    assert hash_object(s1, method) != hash_object(s1.rename("y"), method)
+
+
+@pytest.mark.parametrize("method", ["md5", "blake2"])
+def test_hash_object_index(method):
+    i1 = pd.Index(np.arange(10000))
+    i2 = pd.Index(np.append(np.arange(9999), -1))
+
+    assert hash_object(i1, method) == hash_object(i1.copy(), method)
+    assert hash_object(i1, method) != hash_object(i2, method)
+
+
+@pytest.mark.parametrize("method", ["md5", "blake2"])
+def test_hash_object_ndarray(method):
+    a1 = np.arange(10000.0)
+    a2 = a1.copy()
+    a2[5000] = -1.0
+
+    assert hash_object(a1, method) == hash_object(a1.copy(), method)
+    assert hash_object(a1, method) != hash_object(a2, method)
+    assert hash_object(a1, method) != hash_object(a1.reshape(100, 100), method)
+    assert hash_object(a1, method) != hash_object(a1.astype("float32"), method)
+
+
+def test_hash_object_nested():
+    obj = {"b": [1, 2.0, "c"], "a": (None, slice(1, 2))}
+    reordered = {"a": (None, slice(1, 2)), "b": [1, 2.0, "c"]}
+
+    assert hash_object(obj, "md5") == hash_object(reordered, "md5")
+    assert hash_object(obj, "md5") != hash_object({**obj, "b": [1, 2.0, "d"]}, "md5")
+
+
+def test_hash_object_unknown():
+    with pytest.raises(TypeError):
+        hash_object(object(), "md5")
+    with pytest.raises(TypeError):
+        hash_object(lambda x: x, "blake2")
+
+
+@pytest.fixture
+def multiindex_df():
+    rng = np.random.default_rng(0)
+    n = 200
+    index = pd.MultiIndex.from_arrays(
+        [
+            rng.choice(["c", "a", "b"], n),
+            rng.choice([3, 1, 2, 0], n),
+            rng.choice(["x", "y"], n),
+        ],
+        names=["l0", "l1", "l2"],
+    )
+    return pd.DataFrame({"v": np.arange(n)}, index=index)
+
+
+def test_index_lookup_options(multiindex_df):
+    index = multiindex_df.index
+    lookup = IndexLookup(index)
+
+    assert lookup.options([]) == index.get_level_values(0).unique().tolist()
+    for l0 in index.levels[0]:
+        expected = multiindex_df.xs(l0, level=0).index.get_level_values(0).unique()
+        assert lookup.options([l0]) == expected.tolist()
+        for l1 in lookup.options([l0]):
+            expected = multiindex_df.xs((l0, l1), level=[0, 1]).index.unique()
+            assert lookup.options([l0, l1]) == expected.tolist()
+
+    # All labels on a level, in order of first appearance
+    assert lookup.options([slice(None)]) == index.get_level_values(1).unique().tolist()
+    assert lookup.options(["missing"]) == []
+
+
+def test_index_lookup_positions(multiindex_df):
+    lookup = IndexLookup(multiindex_df.index)
+
+    for key in [["a"], ["b", 2], ["c", 0, "y"], [slice(None), 1]]:
+        level = list(range(len(key)))
+        expected = multiindex_df.xs(tuple(key), level=level, drop_level=False)
+        positions = lookup.positions(key)
+        assert np.all(np.diff(positions) > 0)
+        pd.testing.assert_frame_equal(multiindex_df.iloc[positions], expected)
+
+    assert len(lookup.positions(["missing"])) == 0
+
+
+def test_index_lookup_flat_index():
+    index = pd.Index(["b", "a", "b", "c", "a"])
+    lookup = IndexLookup(index)
+
+    assert lookup.options([]) == ["b", "a", "c"]
+    assert lookup.positions(["b"]).tolist() == [0, 2]
+
+
+def test_ring_buffer_append():
+    buffer = RingBuffer(5)
+    assert buffer.append({"x": [0, 1, 2]}) == 0
+    assert len(buffer) == 3
+
+    df = buffer.to_frame()
+    assert df["x"].tolist() == [0, 1, 2]
+    assert df.index.tolist() == [0, 1, 2]
+
+
+def test_ring_buffer_wraparound():
+    buffer = RingBuffer(5)
+    buffer.append(pd.DataFrame({"x": np.arange(4), "y": np.arange(4) * 0.5}))
+    assert buffer.append({"x": [4, 5, 6], "y": [2.0, 2.5, 3.0]}) == 2
+
+    df = buffer.to_frame()
+    assert len(buffer) == 5
+    assert df["x"].tolist() == [2, 3, 4, 5, 6]
+    assert df["y"].tolist() == [1.0, 1.5, 2.0, 2.5, 3.0]
+    assert df.index.tolist() == [2, 3, 4, 5, 6]
+
+    # More rows than the capacity keeps only the last rows
+    assert buffer.append({"x": np.arange(7, 19), "y": np.zeros(12)}) == 12
+    df = buffer.to_frame()
+    assert df["x"].tolist() == [14, 15, 16, 17, 18]
+    assert df.index.tolist() == [14, 15, 16, 17, 18]
+
+
+def test_ring_buffer_dtypes():
+    buffer = RingBuffer(4)
+    buffer.append({"s": ["a"], "v": [1]})
+    buffer.append({"s": ["abcdef"], "v": [2.7]})
+
+    df = buffer.to_frame()
+    assert df["s"].tolist() == ["a", "abcdef"]
+    assert df["v"].tolist() == [1.0, 2.7]
+    assert df["s"].dtype == object
+    assert df["v"].dtype == np.float64
+
+    with pytest.raises(ValueError):
+        buffer.append({"s": ["b"], "v": np.array(["2020-01-01"], dtype="datetime64[ns]")})
+    with pytest.raises(ValueError):
+        buffer.append({"s": ["b"]})
@@ -0,0 +1,149 @@
+"""Tests for `lumflux.transforms`."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lumflux.cache import Cache, MemoryCache
+from lumflux.sources import FileTableSource, TableSource
+from lumflux.transforms import GetItemTransform, PipeTransform, RescaleTransform
+
+
+def make_rows(n, start=0):
+    index = pd.RangeIndex(start, start + n)
+    return pd.DataFrame({"a": np.arange(start, start + n) * 0.5, "b": index}, index=index)
+
+
+class CountingTableSource(TableSource):
+    """TableSource which counts calls to `get`"""
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self.n_get = 0
+
+    def get(self, name=None):
+        self.n_get += 1
+        return super().get(name)
+
+
+def rescale_chain(source, cache, depth):
+    transform = GetItemTransform(source=source, item="t")
+    for i in range(depth):
+        transform = RescaleTransform(
+            source=transform, columns=["a"], scale_factor=i + 2.0, _cache=cache
+        )
+    return transform
+
+
+def expected_chain(df, depth):
+    factor = np.prod([i + 2.0 for i in range(depth)])
+    return df.assign(a=df["a"] * factor)
+
+
+@pytest.mark.parametrize("cache", [Cache(), MemoryCache()], ids=["no-op", "memory"])
+def test_rescale_chain_fetches_source_once(cache):
+    source = CountingTableSource()
+    source.set(make_rows(10), name="t")
+    transform = rescale_chain(source, cache, depth=3)
+
+    source.n_get = 0
+    transform.get()
+    assert source.n_get == 1
+
+    # Full recompute after the table is replaced
+    source.set(make_rows(5), name="t")
+    source.n_get = 0
+    df = transform.get()
+    assert source.n_get == 1
+    pd.testing.assert_frame_equal(df, expected_chain(make_rows(5), 3))
+
+
+@pytest.mark.parametrize("strategy", ["full", "version", "sampled"])
+def test_incremental_chain_equals_full_recompute(strategy):
+    cache = MemoryCache()
+    source = CountingTableSource(hash_strategy=strategy)
+    source.set(make_rows(10), name="t")
+    rescale = rescale_chain(source, cache, depth=3)
+    query = PipeTransform(
+        source=rescale, pipe=[{"function": "query", "args": ["b % 3 != 0"]}], _cache=cache
+    )
+    query.get()
+
+    n = 10
+    for k in [1, 5, 7]:
+        source.append(make_rows(k, n), name="t")
+        n += k
+
+        source.n_get = 0
+        df = query.get()
+        assert source.n_get == 1
+        assert query.delta is not None
+
+        expected = expected_chain(source.get("t"), 3).query("b % 3 != 0")
+        pd.testing.assert_frame_equal(df, expected)
+
+    # Replacing the table recomputes the chain
+    source.set(make_rows(4), name="t")
+    df = query.get()
+    assert query.delta is None
+    pd.testing.assert_frame_equal(df, expected_chain(make_rows(4), 3).query("b % 3 != 0"))
+
+
+def test_incremental_only_transforms_appended_rows(monkeypatch):
+    cache = MemoryCache()
+    source = TableSource()
+    source.set(make_rows(10), name="t")
+    transform = rescale_chain(source, cache, depth=1)
+    transform.get()
+
+    n_rows = []
+    apply = RescaleTransform.apply
+
+    def counting_apply(self, df):
+        n_rows.append(len(df))
+        return apply(self, df)
+
+    monkeypatch.setattr(RescaleTransform, "apply", counting_apply)
+    source.append(make_rows(3, 10), name="t")
+    transform.get()
+    assert n_rows == [3]
+
+
+
+def test_rescale_input_columns(tmp_path):
+    df = pd.DataFrame({"x": [1.0, 2.0], "y": [3.0, 4.0], "z": [5.0, 6.0], "w": [0, 0]})
+    df.to_parquet(tmp_path / "t.parquet")
+    source = FileTableSource(paths={"t": str(tmp_path / "t.parquet")})
+    item = GetItemTransform(source=source, item="t")
+    rescale = RescaleTransform(source=item, columns=["z"], scale_factor=2.0)
+
+    # Rescaled columns are read even when only other columns are used
+    assert rescale.input_columns(["x", "y"]) == ["x", "y", "z"]
+    assert rescale.input_columns(["z", "x"]) == ["z", "x"]
+    assert rescale.input_columns(None) is None
+
+    item.columns = rescale.input_columns(["x", "y"])
+    result = rescale.get()
+    assert list(result.columns) == ["x", "y", "z"]
+    assert result["z"].tolist() == [10.0, 12.0]
+
+
+def test_hash_invalidated_through_dependents():
+    source = TableSource()
+    source.set(make_rows(10), name="t")
+    first = rescale_chain(source, Cache(), depth=1)
+    second = RescaleTransform(source=first, columns=["a"], scale_factor=3.0)
+
+    h_first, h_second = first.hash, second.hash
+    first.scale_factor = 4.0
+    assert first.hash != h_first
+    assert second.hash != h_second
+
+    # Setting a parameter back restores the hash
+    first.scale_factor = 2.0
+    assert (first.hash, second.hash) == (h_first, h_second)
+
+    # Source updates invalidate the whole chain
+    source.set(make_rows(5), name="t")
+    assert first.hash != h_first
+    assert second.hash != h_second